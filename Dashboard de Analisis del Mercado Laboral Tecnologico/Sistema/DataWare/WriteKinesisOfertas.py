@@ -6,6 +6,8 @@ import time
 import uuid
 import os
 
+from deduplicacion_minhash import ARCHIVO_INDICE, IndiceLSH
+
 # Configurar cliente Kinesis para us-east-2
 kinesis = boto3.client('kinesis', region_name='us-east-2')
 nombre_stream = 'streamOfertas'
@@ -58,6 +60,11 @@ def cargar_ofertas_a_kinesis():
 
     ofertas_enviadas = 0
     errores = 0
+    duplicados = 0
+
+    # Índice LSH de cargas anteriores para detectar reposts con ID nuevo
+    indice = IndiceLSH.cargar(ARCHIVO_INDICE) if os.path.exists(ARCHIVO_INDICE) else IndiceLSH()
+    print(f"🔍 Índice de duplicados: {len(indice)} ofertas previas")
 
     print("🚀 Iniciando envío de datos a Kinesis us-east-2...")
 
@@ -110,6 +117,13 @@ def cargar_ofertas_a_kinesis():
                 'Contenido_Descripcion_Oferta': str(row.get('Contenido_Descripcion_Oferta', ''))
             }
             
+            # Marcar reposts (mismo título, empresa, tecnologías y descripción);
+            # la oferta entra al índice solo si el envío a Kinesis funciona
+            duplicado, firma = indice.evaluar(record['ID_Oferta'], record)
+            if duplicado is not None:
+                record['Duplicado_De'], record['Similitud_Duplicado'] = duplicado[0], round(duplicado[1], 3)
+                duplicados += 1
+
             # Mostrar progreso cada 50 registros
             if (index + 1) % 50 == 0:
                 print(f"📤 Enviando registro {index + 1}/{len(df)}: {record['Titulo_Oferta'][:30]}...")
@@ -120,6 +134,7 @@ def cargar_ofertas_a_kinesis():
                 Data=json.dumps(record, ensure_ascii=False),
                 PartitionKey=str(uuid.uuid4())
             )
+            indice.confirmar(record['ID_Oferta'], firma, duplicado)
 
             ofertas_enviadas += 1
             time.sleep(0.1)  # Pausa pequeña para evitar throttling
@@ -130,8 +145,11 @@ def cargar_ofertas_a_kinesis():
                 print(f"❌ Error procesando registro {index + 1}: {e}")
             continue
 
+    indice.guardar(ARCHIVO_INDICE)
+
     print(f"\n=== RESUMEN DE CARGA ===")
     print(f"✅ Ofertas enviadas exitosamente: {ofertas_enviadas}")
+    print(f"🔁 Reposts marcados como duplicados: {duplicados}")
     print(f"❌ Errores encontrados: {errores}")
     print(f"📊 Total procesado: {len(df)}")
     print(f"🎯 Tasa de éxito: {(ofertas_enviadas/len(df)*100):.1f}%")
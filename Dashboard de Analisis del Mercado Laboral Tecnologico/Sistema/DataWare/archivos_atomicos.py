@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+
+def escribir_atomico(ruta, escribir):
+    """
+    Escribe un archivo en un temporal del mismo directorio y lo reemplaza
+    de forma atómica, para que Power BI nunca lea un archivo a medias
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(
+        prefix=f'.{os.path.basename(ruta)}.', suffix='.tmp', dir=directorio
+    )
+    os.close(descriptor)
+    try:
+        escribir(temporal)
+        # 'r+b': en Windows fsync (FlushFileBuffers) requiere acceso de escritura
+        with open(temporal, 'r+b') as f:
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+def escribir_json_atomico(ruta, datos):
+    """
+    Escribe un JSON con reemplazo atómico
+    """
+    def escribir(temporal):
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+    escribir_atomico(ruta, escribir)
@@ -1,18 +1,169 @@
 import boto3
 import pandas as pd
-import json
-from decimal import Decimal
 from datetime import datetime
 import schedule
 import time
 import os
+from botocore.exceptions import BotoCoreError, ClientError
+
+from archivos_atomicos import escribir_atomico, escribir_json_atomico
+from codec_ofertas import escanear_columnas
+from deduplicacion_minhash import descartar_duplicados
+from derivadas_powerbi import aplicar_derivadas
+from historial_snapshots import HistorialSnapshots
+from particiones_fecha import consultar_ventana, resolver_fecha
+
+class ProgramadorRefresco:
+    """
+    Decide cuándo reconstruir el CSV a partir de los cambios observados:
+    agrupa ráfagas de cambios en una sola reconstrucción y limita la
+    frecuencia máxima de reconstrucciones
+    """
+    def __init__(self, min_cambios=50, max_espera=60, silencio=5, intervalo_minimo=30):
+        self.min_cambios = min_cambios            # Volumen que dispara el refresco
+        self.max_espera = max_espera              # Antigüedad máxima de un cambio pendiente (s)
+        self.silencio = silencio                  # Pausa que marca el fin de una ráfaga (s)
+        self.intervalo_minimo = intervalo_minimo  # Tiempo mínimo entre reconstrucciones (s)
+        self.pendientes = 0
+        self.primer_cambio = None
+        self.ultimo_cambio = None
+        self.ultimo_refresco = None
+    
+    def registrar_cambios(self, cantidad, ahora=None):
+        if cantidad <= 0:
+            return
+        ahora = time.monotonic() if ahora is None else ahora
+        if self.pendientes == 0:
+            self.primer_cambio = ahora
+        self.pendientes += cantidad
+        self.ultimo_cambio = ahora
+    
+    def debe_refrescar(self, ahora=None):
+        if self.pendientes == 0:
+            return False
+        ahora = time.monotonic() if ahora is None else ahora
+        
+        # Límite de frecuencia
+        if self.ultimo_refresco is not None and ahora - self.ultimo_refresco < self.intervalo_minimo:
+            return False
+        
+        # Umbral de volumen, esperando a que termine la ráfaga
+        if self.pendientes >= self.min_cambios and ahora - self.ultimo_cambio >= self.silencio:
+            return True
+        
+        # Umbral de antigüedad (aunque la ráfaga continúe)
+        return ahora - self.primer_cambio >= self.max_espera
+    
+    def marcar_refresco(self, ahora=None):
+        self.ultimo_refresco = time.monotonic() if ahora is None else ahora
+        self.pendientes = 0
+        self.primer_cambio = None
+        self.ultimo_cambio = None
+
+class FuenteCambiosStream:
+    """
+    Cuenta los cambios de la tabla leyendo su DynamoDB Stream
+    (StreamViewType NEW_AND_OLD_IMAGES en Kinesis-DynamoDB.yaml)
+    """
+    def __init__(self, nombre_tabla, region='us-east-2'):
+        self.dynamodb = boto3.client('dynamodb', region_name=region)
+        self.streams = boto3.client('dynamodbstreams', region_name=region)
+        self.nombre_tabla = nombre_tabla
+        self.stream_arn = None
+        self.iteradores = {}
+        self.secuencias = {}
+        self.shards_cerrados = set()
+        # Cambios ya leídos de algunos shards cuando otro falla; se reportan
+        # en la siguiente lectura exitosa
+        self.cambios_leidos = 0
+    
+    def _iterador(self, shard_id, tipo):
+        parametros = {'StreamArn': self.stream_arn, 'ShardId': shard_id, 'ShardIteratorType': tipo}
+        if tipo == 'AFTER_SEQUENCE_NUMBER':
+            parametros['SequenceNumber'] = self.secuencias[shard_id]
+        return self.streams.get_shard_iterator(**parametros)['ShardIterator']
+    
+    def _descubrir_shards(self):
+        if self.stream_arn is None:
+            tabla = self.dynamodb.describe_table(TableName=self.nombre_tabla)['Table']
+            self.stream_arn = tabla.get('LatestStreamArn')
+            if not self.stream_arn:
+                raise RuntimeError(f"La tabla {self.nombre_tabla} no tiene Stream habilitado")
+        
+        # Primer descubrimiento: los shards abiertos desde ahora; después,
+        # los hijos de un shard cerrado desde el inicio
+        tipo = 'LATEST' if not self.iteradores and not self.shards_cerrados else 'TRIM_HORIZON'
+        parametros = {'StreamArn': self.stream_arn}
+        while True:
+            descripcion = self.streams.describe_stream(**parametros)['StreamDescription']
+            for shard in descripcion['Shards']:
+                shard_id = shard['ShardId']
+                if shard_id in self.iteradores or shard_id in self.shards_cerrados:
+                    continue
+                if 'EndingSequenceNumber' in shard['SequenceNumberRange']:
+                    continue
+                self.iteradores[shard_id] = self._iterador(shard_id, tipo)
+            if 'LastEvaluatedShardId' not in descripcion:
+                break
+            parametros['ExclusiveStartShardId'] = descripcion['LastEvaluatedShardId']
+    
+    def iniciar(self):
+        """
+        Fija los iteradores en LATEST; llamar antes del sync inicial para que
+        los cambios escritos durante ese scan se cuenten en la primera lectura
+        """
+        if not self.iteradores:
+            self._descubrir_shards()
+    
+    def leer(self):
+        """
+        Devuelve la cantidad de cambios nuevos desde la última lectura
+        """
+        if not self.iteradores:
+            self._descubrir_shards()
+        
+        for shard_id, iterador in list(self.iteradores.items()):
+            try:
+                response = self.streams.get_records(ShardIterator=iterador, Limit=1000)
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ExpiredIteratorException':
+                    raise
+                # Iterador vencido (15 min, p. ej. durante un sync largo):
+                # retomar tras el último registro visto; sin registros previos
+                # no se sabe qué pasó en el intervalo, se cuenta como un cambio
+                if shard_id in self.secuencias:
+                    self.iteradores[shard_id] = self._iterador(shard_id, 'AFTER_SEQUENCE_NUMBER')
+                else:
+                    self.iteradores[shard_id] = self._iterador(shard_id, 'LATEST')
+                    self.cambios_leidos += 1
+                continue
+            if response['Records']:
+                self.secuencias[shard_id] = response['Records'][-1]['dynamodb']['SequenceNumber']
+            self.cambios_leidos += len(response['Records'])
+            siguiente = response.get('NextShardIterator')
+            if siguiente:
+                self.iteradores[shard_id] = siguiente
+            else:
+                # Shard cerrado (rotación del stream): buscar los nuevos
+                del self.iteradores[shard_id]
+                self.secuencias.pop(shard_id, None)
+                self.shards_cerrados.add(shard_id)
+                self._descubrir_shards()
+        cambios, self.cambios_leidos = self.cambios_leidos, 0
+        return cambios
 
 class PowerBIAutoRefresh:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-        self.table = self.dynamodb.Table('ofertas_trabajo')
+    def __init__(self, desde=None, hasta=None):
+        self.dynamodb = boto3.client('dynamodb', region_name='us-east-2')
+        self.table_name = 'ofertas_trabajo'
         self.csv_file = 'ofertas_powerbi_live.csv'
         self.metadata_file = 'powerbi_metadata.json'
+        # Ventana de fechas opcional ('YYYY-MM-DD' o relativa como '30d',
+        # que se recalcula en cada sincronización)
+        self.desde = desde
+        self.hasta = hasta
+        # Historial de versiones (deltas contra bases periódicas)
+        self.historial = HistorialSnapshots(os.path.join('historial_powerbi', 'live'))
         
     def sync_data(self):
         """
@@ -22,39 +173,24 @@ class PowerBIAutoRefresh:
         print(f"🔄 {timestamp}: Sincronizando datos para Power BI...")
         
         try:
-            # 1. Obtener datos de DynamoDB
-            response = self.table.scan()
-            items = response['Items']
-            
-            # Manejar paginación
-            while 'LastEvaluatedKey' in response:
-                response = self.table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-                items.extend(response['Items'])
+            # 1. Obtener datos de DynamoDB (paginado, decodificado a columnas)
+            if self.desde is not None:
+                desde = resolver_fecha(self.desde)
+                hasta = resolver_fecha(self.hasta) or timestamp.date()
+                print(f"🗓️ Ventana: {desde.isoformat()} → {hasta.isoformat()}")
+                columnas = consultar_ventana(self.dynamodb, desde, hasta)
+            else:
+                columnas = escanear_columnas(self.dynamodb, self.table_name)
             
-            if not items:
+            if not columnas.get('ID_Oferta'):
                 print("❌ No hay datos en DynamoDB")
                 return False
             
-            # 2. Convertir a DataFrame
-            def decimal_to_float(obj):
-                if isinstance(obj, Decimal):
-                    return float(obj)
-                raise TypeError
+            # 2. Convertir a DataFrame (sin reposts marcados como duplicados)
+            df, _ = descartar_duplicados(pd.DataFrame(columnas))
             
-            items_json = json.loads(json.dumps(items, default=decimal_to_float))
-            df = pd.DataFrame(items_json)
-            
-            # 3. Limpiar datos para Power BI
-            list_columns = [
-                'Lenguajes_Lista', 'Frameworks_Lista', 'Bases_Datos_Lista', 
-                'Herramientas_Lista', 'Conocimientos_Adicionales_Lista'
-            ]
-            
-            for col in list_columns:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: 
-                        ', '.join(x) if isinstance(x, list) and x else 'No especificado'
-                    )
+            # 3. Limpiar datos para Power BI (mismas columnas derivadas que el export)
+            df = aplicar_derivadas(df)
             
             # Rellenar valores nulos
             df = df.fillna('No especificado')
@@ -74,9 +210,12 @@ class PowerBIAutoRefresh:
                     if df_compare.equals(df_anterior_compare):
                         cambios_detectados = False
             
-            # 6. Guardar solo si hay cambios
+            # 6. Guardar solo si hay cambios (reemplazo atómico de CSV y metadata)
             if cambios_detectados:
-                df.to_csv(self.csv_file, index=False, encoding='utf-8-sig')
+                escribir_atomico(
+                    self.csv_file,
+                    lambda temporal: df.to_csv(temporal, index=False, encoding='utf-8-sig')
+                )
                 
                 # Crear metadata
                 metadata = {
@@ -89,8 +228,14 @@ class PowerBIAutoRefresh:
                     'status': 'OK'
                 }
                 
-                with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                escribir_json_atomico(self.metadata_file, metadata)
+                
+                # Guardar la versión en el historial para análisis de tendencias
+                # (las ventanas de fechas son vistas parciales y no se versionan)
+                if self.desde is None:
+                    entrada = self.historial.registrar(df, metadata['version'])
+                    if entrada:
+                        print(f"🗂️ Versión {entrada['version']} guardada en el historial ({entrada['tipo']})")
                 
                 print(f"✅ Datos actualizados: {len(df)} registros")
                 print(f"📊 Archivo: {self.csv_file}")
@@ -112,8 +257,7 @@ class PowerBIAutoRefresh:
                 'cambios_detectados': False
             }
             
-            with open(self.metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            escribir_json_atomico(self.metadata_file, metadata)
             
             return False
     
@@ -142,20 +286,90 @@ class PowerBIAutoRefresh:
         except KeyboardInterrupt:
             print("\n🛑 Auto-refresh detenido")
             print("💾 Última sincronización preservada")
+    
+    def iniciar_por_eventos(self, programador=None, pausa_minima=1, pausa_maxima=10, espera_error_maxima=60):
+        """
+        Refresca solo cuando el DynamoDB Stream reporta cambios, según los
+        umbrales del programador; en reposo no escanea ni reescribe nada
+        """
+        programador = programador or ProgramadorRefresco()
+        fuente = FuenteCambiosStream(self.table_name)
+        
+        print("🚀 INICIANDO AUTO-REFRESH POR EVENTOS PARA POWER BI")
+        print("=" * 50)
+        print(f"📊 Archivo CSV: {self.csv_file}")
+        print(f"📈 Umbral de volumen: {programador.min_cambios} cambios")
+        print(f"⏰ Antigüedad máxima: {programador.max_espera} s")
+        print(f"⏱️ Intervalo mínimo entre refrescos: {programador.intervalo_minimo} s")
+        print("📋 Presiona Ctrl+C para detener")
+        print("=" * 50)
+        
+        # Posicionarse en el Stream antes del sync inicial: lo que llegue
+        # durante el scan completo dispara el siguiente refresco
+        try:
+            fuente.iniciar()
+        except (BotoCoreError, ClientError) as e:
+            print(f"⚠️ Error leyendo el Stream: {e}. Se reintentará tras el sync inicial")
+        
+        # Sync inicial
+        self.sync_data()
+        programador.marcar_refresco()
+        
+        pausa = pausa_minima
+        espera_error = None
+        try:
+            while True:
+                try:
+                    cambios = fuente.leer()
+                    espera_error = None
+                except (BotoCoreError, ClientError) as e:
+                    # Error transitorio (red, throttling...): reintentar con
+                    # espera creciente sin perder los cambios ya pendientes
+                    cambios = 0
+                    espera_error = min(espera_error * 2, espera_error_maxima) if espera_error else pausa_minima
+                    print(f"⚠️ Error leyendo el Stream: {e}. Reintentando en {espera_error} s")
+                programador.registrar_cambios(cambios)
+                
+                if programador.debe_refrescar():
+                    print(f"📬 {programador.pendientes} cambios pendientes")
+                    self.sync_data()
+                    programador.marcar_refresco()
+                
+                # Sondeo rápido con actividad, más espaciado en reposo
+                pausa = pausa_minima if cambios or programador.pendientes else min(pausa * 2, pausa_maxima)
+                time.sleep(espera_error or pausa)
+        except KeyboardInterrupt:
+            print("\n🛑 Auto-refresh detenido")
+            print("💾 Última sincronización preservada")
 
 def main():
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Auto-refresh del CSV de Power BI')
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument('--once', action='store_true', help='Ejecutar una sola vez (default)')
+    modo.add_argument('--monitor', nargs='?', type=int, const=30, metavar='MINUTOS',
+                      help='Monitor continuo (default 30 min)')
+    modo.add_argument('--eventos', action='store_true',
+                      help='Refresco disparado por cambios en el DynamoDB Stream')
+    parser.add_argument('--since', help="Fecha inicial de publicación (YYYY-MM-DD o relativa, ej. 30d)")
+    parser.add_argument('--until', help="Fecha final de publicación (YYYY-MM-DD, por defecto hoy)")
+    args = parser.parse_args()
+    if args.until and not args.since:
+        parser.error('--until requiere --since')
+    # Validar las fechas antes de iniciar
+    try:
+        resolver_fecha(args.since)
+        resolver_fecha(args.until)
+    except ValueError as e:
+        parser.error(str(e))
     
-    refresh_manager = PowerBIAutoRefresh()
+    refresh_manager = PowerBIAutoRefresh(desde=args.since, hasta=args.until)
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--once':
-            # Ejecutar una sola vez
-            refresh_manager.sync_data()
-        elif sys.argv[1] == '--monitor':
-            # Monitor continuo (default 30 min)
-            intervalo = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-            refresh_manager.iniciar_monitor(intervalo)
+    if args.monitor is not None:
+        refresh_manager.iniciar_monitor(args.monitor)
+    elif args.eventos:
+        refresh_manager.iniciar_por_eventos()
     else:
         # Una sola ejecución por default
         refresh_manager.sync_data()
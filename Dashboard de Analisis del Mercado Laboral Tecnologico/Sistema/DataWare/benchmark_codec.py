@@ -0,0 +1,131 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from codec_ofertas import codificar_oferta, decodificar_columnas, decodificar_oferta
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+OFERTA_EJEMPLO = {
+    'ID_Oferta': '1070',
+    'Titulo_Oferta': 'Ingeniero/a de Machine Learning',
+    'Ciudad': 'Puebla',
+    'Region_Departamento': 'Guanajuato',
+    'Fecha_Publicacion': '22/05/2025',
+    'Tipo_Contrato': 'Contrato intermitente',
+    'Tipo_Jornada': 'Por horas',
+    'Modalidad_Trabajo': 'Ambos',
+    'Salario_Monto': 3000.0,
+    'Salario_Moneda': 'USD',
+    'Salario_Tipo_Pago': 'Mensual',
+    'Lenguajes_Lista': ['Python', 'Javascript', 'Sql'],
+    'Frameworks_Lista': ['React', 'Node.Js'],
+    'Bases_Datos_Lista': ['Mongodb', 'Postgresql'],
+    'Herramientas_Lista': ['Git', 'Jenkins'],
+    'Nivel_Ingles': 'Avanzado',
+    'Nivel_Educacion': 'Maestria',
+    'Anos_Experiencia': 2,
+    'Conocimientos_Adicionales_Lista': ['Python', 'Java', 'Node.Js'],
+    'Edad_Minima': 22,
+    'Edad_Maxima': 46,
+    'Categoria_Puesto': 'Arquitecto/a de software',
+    'Nombre_Empresa': 'Lee, Sullivan and Harris',
+    'Contenido_Descripcion_Empresa': 'Start-up en crecimiento con foco en nuevas tecnologias.',
+    'Enlace_Oferta': 'https://russell.com/',
+    'Contenido_Descripcion_Oferta': 'Necesitamos un ingeniero de software con experiencia en DevOps.',
+    'fecha_procesamiento': '2025-06-01T10:00:00',
+}
+
+# Snippets de arranque en frío (import + creación del cliente de DynamoDB)
+ARRANQUE_RESOURCE = (
+    "import boto3, decimal\n"
+    "boto3.resource('dynamodb', region_name='us-east-2').Table('ofertas_trabajo')\n"
+)
+ARRANQUE_LAMBDA = (
+    "import importlib.util\n"
+    "spec = importlib.util.spec_from_file_location('lambda_ofertas', 'lambda.py')\n"
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+)
+
+
+def _medir(funcion, repeticiones):
+    """
+    Devuelve el costo por llamada en microsegundos (mejor de 5 rondas)
+    """
+    mejores = []
+    for _ in range(5):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        mejores.append((time.perf_counter() - inicio) / repeticiones * 1e6)
+    return min(mejores)
+
+
+def benchmark_por_item(repeticiones=20000):
+    """
+    Compara codificación/decodificación por ítem: codec vs capa resource
+    """
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+
+    def codificar_resource():
+        # Lo que hacía lambda.py: Decimal + TypeSerializer por atributo
+        item = dict(OFERTA_EJEMPLO, Salario_Monto=Decimal(str(OFERTA_EJEMPLO['Salario_Monto'])))
+        return {k: serializer.serialize(v) for k, v in item.items()}
+
+    crudo = codificar_oferta(OFERTA_EJEMPLO)
+
+    def decodificar_resource():
+        # TypeDeserializer + conversión Decimal -> float como en los exportadores
+        item = {k: deserializer.deserialize(v) for k, v in crudo.items()}
+        return {k: float(v) if isinstance(v, Decimal) else v for k, v in item.items()}
+
+    resultados = {
+        'codificar_resource_us': _medir(codificar_resource, repeticiones),
+        'codificar_codec_us': _medir(lambda: codificar_oferta(OFERTA_EJEMPLO), repeticiones),
+        'decodificar_resource_us': _medir(decodificar_resource, repeticiones),
+        'decodificar_codec_us': _medir(lambda: decodificar_oferta(crudo), repeticiones),
+    }
+
+    pagina = [crudo] * 1000
+    resultados['decodificar_columnas_us'] = _medir(
+        lambda: decodificar_columnas(pagina), max(repeticiones // 1000, 1)
+    ) / len(pagina)
+    return resultados
+
+
+def benchmark_arranque(repeticiones=10):
+    """
+    Mide el tiempo de import + inicialización del cliente en procesos nuevos
+    """
+    entorno = dict(os.environ, AWS_DEFAULT_REGION='us-east-2')
+    resultados = {}
+    for nombre, codigo in (('resource', ARRANQUE_RESOURCE), ('lambda_codec', ARRANQUE_LAMBDA)):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, '-c', codigo], cwd=DIRECTORIO, env=entorno, check=True)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        resultados[f'arranque_{nombre}_ms'] = statistics.median(tiempos)
+    return resultados
+
+
+if __name__ == "__main__":
+    print("⏱️ BENCHMARK CODEC DYNAMODB vs CAPA RESOURCE")
+    print("=" * 50)
+
+    por_item = benchmark_por_item()
+    print(f"📤 Codificar (resource): {por_item['codificar_resource_us']:.2f} µs/ítem")
+    print(f"📤 Codificar (codec):    {por_item['codificar_codec_us']:.2f} µs/ítem")
+    print(f"📥 Decodificar (resource): {por_item['decodificar_resource_us']:.2f} µs/ítem")
+    print(f"📥 Decodificar (codec):    {por_item['decodificar_codec_us']:.2f} µs/ítem")
+    print(f"📥 Decodificar a columnas: {por_item['decodificar_columnas_us']:.2f} µs/ítem")
+
+    arranque = benchmark_arranque()
+    print(f"\n🧊 Arranque en frío (resource):     {arranque['arranque_resource_ms']:.0f} ms")
+    print(f"🧊 Arranque en frío (lambda.py):    {arranque['arranque_lambda_codec_ms']:.0f} ms")
@@ -0,0 +1,85 @@
+import sys
+import time
+
+import numpy as np
+
+from deduplicacion_minhash import IndiceLSH, tejas_oferta
+
+TITULOS = [
+    'Desarrollador/a Full Stack', 'Ingeniero/a de Machine Learning', 'Analista de Datos',
+    'Arquitecto/a de software', 'Ingeniero/a DevOps', 'Desarrollador/a Backend',
+    'Desarrollador/a Frontend', 'Ingeniero/a de seguridad informatica', 'Cientifico/a de Datos',
+    'Administrador/a de Bases de Datos',
+]
+TECNOLOGIAS = [
+    'Python', 'Javascript', 'Sql', 'Java', 'C#', 'React', 'Node.Js', 'Django', 'Angular',
+    'Postgresql', 'Mongodb', 'Mysql', 'Git', 'Docker', 'Aws', 'Jenkins', 'Kubernetes',
+]
+
+
+def generar_corpus(total, proporcion_reposts=0.05, semilla=7):
+    """
+    Corpus sintético: ofertas únicas más reposts de ofertas anteriores con
+    ID nuevo y una palabra cambiada en la descripción
+    """
+    rng = np.random.default_rng(semilla)
+    vocabulario = [f"palabra{i}" for i in range(5000)]
+    empresas = [f"Empresa {i} SAC" for i in range(20000)]
+
+    ofertas, originales = [], {}
+    for i in range(total):
+        if i > 100 and rng.random() < proporcion_reposts:
+            base = ofertas[int(rng.integers(0, i))]
+            palabras = base['Contenido_Descripcion_Oferta'].split()
+            palabras[int(rng.integers(0, len(palabras)))] = vocabulario[int(rng.integers(0, 5000))]
+            oferta = dict(base, ID_Oferta=f"R{i}", Contenido_Descripcion_Oferta=' '.join(palabras))
+            originales[oferta['ID_Oferta']] = originales.get(base['ID_Oferta'], base['ID_Oferta'])
+        else:
+            oferta = {
+                'ID_Oferta': f"O{i}",
+                'Titulo_Oferta': TITULOS[int(rng.integers(0, len(TITULOS)))],
+                'Nombre_Empresa': empresas[int(rng.integers(0, len(empresas)))],
+                'Contenido_Descripcion_Oferta': ' '.join(
+                    vocabulario[j] for j in rng.integers(0, 5000, size=25)
+                ),
+                'Lenguajes_Lista': list(rng.choice(TECNOLOGIAS, size=3, replace=False)),
+            }
+        ofertas.append(oferta)
+    return ofertas, originales
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"⏱️ BENCHMARK DEDUPLICACIÓN MinHash/LSH ({total:,} ofertas)")
+    print("=" * 50)
+
+    ofertas, originales = generar_corpus(total)
+    print(f"📋 Reposts sintéticos: {len(originales):,}")
+
+    indice = IndiceLSH()
+    latencias = []
+    aciertos = falsos_positivos = 0
+    inicio = time.perf_counter()
+    for oferta in ofertas:
+        firma = indice.firma(tejas_oferta(oferta))
+        t0 = time.perf_counter()
+        resultado = indice.buscar(firma)
+        latencias.append(time.perf_counter() - t0)
+        indice.agregar(oferta['ID_Oferta'], firma)
+
+        if resultado is None:
+            continue
+        grupo_resultado = originales.get(resultado[0], resultado[0])
+        if originales.get(oferta['ID_Oferta']) == grupo_resultado:
+            aciertos += 1
+        else:
+            falsos_positivos += 1
+    segundos = time.perf_counter() - inicio
+
+    latencias = np.array(latencias) * 1e6
+    print(f"🚀 Ingesta total: {segundos:.1f} s ({total / segundos:,.0f} ofertas/s)")
+    print(f"🔎 Búsqueda de candidatos p50: {np.percentile(latencias, 50):.0f} µs")
+    print(f"🔎 Búsqueda de candidatos p99: {np.percentile(latencias, 99):.0f} µs")
+    print(f"🎯 Recall: {aciertos / max(len(originales), 1):.3%}")
+    print(f"⚠️ Falsos positivos: {falsos_positivos:,}")
@@ -0,0 +1,99 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from derivadas_powerbi import aplicar_derivadas
+
+LENGUAJES = ['Python', 'Javascript', 'Sql', 'Java', 'C#', 'Typescript', 'Go', 'Php', 'Ruby', 'Kotlin']
+FRAMEWORKS = ['React', 'Node.Js', 'Django', 'Angular', 'Spring', 'Flask', 'Vue', '.Net']
+BASES_DATOS = ['Postgresql', 'Mongodb', 'Mysql', 'Oracle', 'Redis', 'Sql Server']
+HERRAMIENTAS = ['Git', 'Docker', 'Aws', 'Jenkins', 'Kubernetes', 'Jira']
+
+
+def generar_ofertas(total, semilla=42):
+    """
+    Genera un DataFrame sintético con la forma que devuelve el scan
+    """
+    rng = np.random.default_rng(semilla)
+
+    def listas(catalogo, maximo):
+        tamanos = rng.integers(0, maximo + 1, size=total)
+        return [list(rng.choice(catalogo, size=n, replace=False)) for n in tamanos]
+
+    salarios = rng.choice([0, 1500, 3000, 4300, 35000, 60000, 95000, 150000], size=total).astype(float)
+    return pd.DataFrame({
+        'ID_Oferta': np.arange(total).astype(str),
+        'Salario_Monto': salarios,
+        'Lenguajes_Lista': listas(LENGUAJES, 4),
+        'Frameworks_Lista': listas(FRAMEWORKS, 3),
+        'Bases_Datos_Lista': listas(BASES_DATOS, 2),
+        'Herramientas_Lista': listas(HERRAMIENTAS, 3),
+        'Conocimientos_Adicionales_Lista': listas(LENGUAJES + FRAMEWORKS, 3),
+    })
+
+
+def derivadas_con_apply(df):
+    """
+    Cadena de apply fila por fila que usaba export_to_powerbi.py
+    """
+    for col in ['Lenguajes_Lista', 'Frameworks_Lista', 'Bases_Datos_Lista',
+                'Herramientas_Lista', 'Conocimientos_Adicionales_Lista']:
+        df[col] = df[col].apply(lambda x: ' | '.join(x) if isinstance(x, list) and x else 'No especificado')
+        if col == 'Lenguajes_Lista':
+            df['Total_Lenguajes'] = df[col].apply(lambda x: len(x.split(' | ')) if x != 'No especificado' else 0)
+            for lenguaje in ['Python', 'JavaScript', 'Java', 'C#', 'React', 'Angular']:
+                df[f'Usa_{lenguaje}'] = df[col].apply(lambda x: 'Sí' if lenguaje in x else 'No')
+        elif col == 'Frameworks_Lista':
+            df['Total_Frameworks'] = df[col].apply(lambda x: len(x.split(' | ')) if x != 'No especificado' else 0)
+        elif col == 'Bases_Datos_Lista':
+            df['Total_BD'] = df[col].apply(lambda x: len(x.split(' | ')) if x != 'No especificado' else 0)
+
+    def categorizar_salario(salario):
+        if pd.isna(salario) or salario == 0:
+            return 'No especificado'
+        elif salario < 30000:
+            return 'Hasta $30K'
+        elif salario < 50000:
+            return '$30K - $50K'
+        elif salario < 80000:
+            return '$50K - $80K'
+        elif salario < 120000:
+            return '$80K - $120K'
+        else:
+            return 'Más de $120K'
+
+    df['Rango_Salario'] = df['Salario_Monto'].apply(categorizar_salario)
+    return df
+
+
+def medir(funcion, df):
+    copia = df.copy()
+    inicio = time.perf_counter()
+    resultado = funcion(copia)
+    return time.perf_counter() - inicio, resultado
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"⏱️ BENCHMARK COLUMNAS DERIVADAS ({total:,} filas)")
+    print("=" * 50)
+
+    df = generar_ofertas(total)
+    segundos_apply, original = medir(derivadas_con_apply, df)
+    segundos_motor, nuevo = medir(aplicar_derivadas, df)
+
+    print(f"🐢 Cadena de apply:   {segundos_apply:.2f} s")
+    print(f"🚀 Motor vectorizado: {segundos_motor:.2f} s")
+    print(f"📈 Aceleración: {segundos_apply / segundos_motor:.1f}x")
+
+    # Las columnas sin ambigüedad deben coincidir exactamente
+    for col in ['Lenguajes_Lista', 'Total_Lenguajes', 'Total_Frameworks', 'Total_BD', 'Rango_Salario', 'Usa_Python']:
+        iguales = (original[col].astype(str) == nuevo[col].astype(str)).all()
+        print(f"   {'✅' if iguales else '❌'} {col}")
+
+    # 'Java' por subcadena también marcaba las ofertas con 'Javascript'
+    diferencias = (original['Usa_Java'] != nuevo['Usa_Java']).sum()
+    print(f"   ℹ️ Usa_Java: {diferencias:,} falsos positivos de la búsqueda por subcadena corregidos")
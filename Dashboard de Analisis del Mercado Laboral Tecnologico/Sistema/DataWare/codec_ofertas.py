@@ -0,0 +1,224 @@
+import math
+from decimal import Decimal
+
+# Tipos de campo del esquema fijo de 'ofertas_trabajo'
+TEXTO = 'S'
+ENTERO = 'I'
+NUMERO = 'N'
+LISTA = 'L'
+
+ESQUEMA_OFERTA = {
+    'ID_Oferta': TEXTO,
+    'Titulo_Oferta': TEXTO,
+    'Ciudad': TEXTO,
+    'Region_Departamento': TEXTO,
+    'Fecha_Publicacion': TEXTO,
+    'Tipo_Contrato': TEXTO,
+    'Tipo_Jornada': TEXTO,
+    'Modalidad_Trabajo': TEXTO,
+    'Salario_Monto': NUMERO,
+    'Salario_Moneda': TEXTO,
+    'Salario_Tipo_Pago': TEXTO,
+    'Lenguajes_Lista': LISTA,
+    'Frameworks_Lista': LISTA,
+    'Bases_Datos_Lista': LISTA,
+    'Herramientas_Lista': LISTA,
+    'Nivel_Ingles': TEXTO,
+    'Nivel_Educacion': TEXTO,
+    'Anos_Experiencia': ENTERO,
+    'Conocimientos_Adicionales_Lista': LISTA,
+    'Edad_Minima': ENTERO,
+    'Edad_Maxima': ENTERO,
+    'Categoria_Puesto': TEXTO,
+    'Nombre_Empresa': TEXTO,
+    'Contenido_Descripcion_Empresa': TEXTO,
+    'Enlace_Oferta': TEXTO,
+    'Contenido_Descripcion_Oferta': TEXTO,
+    'fecha_procesamiento': TEXTO,
+    # Campos del índice por fecha (ver particiones_fecha.py)
+    'Fecha_ISO': TEXTO,
+    'Mes_Publicacion': TEXTO,
+    'Region_Mes': TEXTO,
+    # Marca de repost (ver deduplicacion_minhash.py)
+    'Duplicado_De': TEXTO,
+    'Similitud_Duplicado': NUMERO,
+}
+
+_NULO = {'NULL': True}
+
+
+def _numero_a_texto(valor):
+    """
+    Convierte un número a la representación que acepta DynamoDB en 'N'
+    """
+    if isinstance(valor, Decimal):
+        texto = str(valor)
+    elif isinstance(valor, int):
+        return str(valor)
+    else:
+        valor = float(valor)
+        if not math.isfinite(valor):
+            raise ValueError(f"DynamoDB no admite el número {valor}")
+        texto = repr(valor)
+    if texto in ('NaN', 'Infinity', '-Infinity', 'sNaN'):
+        raise ValueError(f"DynamoDB no admite el número {texto}")
+    return texto
+
+
+def _texto_a_numero(texto):
+    """
+    Convierte un 'N' de DynamoDB a int si es entero, si no a float
+    """
+    try:
+        return int(texto)
+    except ValueError:
+        return float(texto)
+
+
+def _codificar_generico(valor):
+    """
+    Codifica valores fuera del esquema (mismas reglas que TypeSerializer)
+    """
+    if valor is None:
+        return _NULO
+    if isinstance(valor, bool):
+        return {'BOOL': valor}
+    if isinstance(valor, str):
+        return {'S': valor}
+    if isinstance(valor, (int, float, Decimal)):
+        return {'N': _numero_a_texto(valor)}
+    if isinstance(valor, (bytes, bytearray)):
+        return {'B': bytes(valor)}
+    if isinstance(valor, dict):
+        return {'M': {str(k): _codificar_generico(v) for k, v in valor.items()}}
+    if isinstance(valor, (list, tuple)):
+        return {'L': [_codificar_generico(v) for v in valor]}
+    if isinstance(valor, set):
+        if all(isinstance(v, str) for v in valor):
+            return {'SS': list(valor)}
+        return {'NS': [_numero_a_texto(v) for v in valor]}
+    raise TypeError(f"Tipo no soportado para DynamoDB: {type(valor).__name__}")
+
+
+def _decodificar_generico(av):
+    """
+    Decodifica cualquier AttributeValue a tipos nativos (números como int/float)
+    """
+    if 'S' in av:
+        return av['S']
+    if 'N' in av:
+        return _texto_a_numero(av['N'])
+    if 'L' in av:
+        return [_decodificar_generico(v) for v in av['L']]
+    if 'M' in av:
+        return {k: _decodificar_generico(v) for k, v in av['M'].items()}
+    if 'BOOL' in av:
+        return av['BOOL']
+    if 'NULL' in av:
+        return None
+    if 'SS' in av:
+        return set(av['SS'])
+    if 'NS' in av:
+        return {_texto_a_numero(v) for v in av['NS']}
+    if 'B' in av:
+        return av['B']
+    if 'BS' in av:
+        return set(av['BS'])
+    raise TypeError(f"AttributeValue no reconocido: {list(av)}")
+
+
+def codificar_oferta(oferta):
+    """
+    Convierte una oferta (dict nativo) al mapa AttributeValue de DynamoDB
+    sin pasar por TypeSerializer ni Decimal
+    """
+    item = {}
+    for campo, valor in oferta.items():
+        tipo = ESQUEMA_OFERTA.get(campo)
+        if valor is None:
+            item[campo] = _NULO
+        elif tipo is TEXTO:
+            item[campo] = {'S': valor if type(valor) is str else str(valor)}
+        elif tipo is LISTA:
+            item[campo] = {'L': [{'S': v if type(v) is str else str(v)} for v in valor]}
+        elif tipo is ENTERO:
+            item[campo] = {'N': str(int(valor))}
+        elif tipo is NUMERO:
+            item[campo] = {'N': _numero_a_texto(valor)}
+        else:
+            item[campo] = _codificar_generico(valor)
+    return item
+
+
+def decodificar_oferta(item):
+    """
+    Convierte un mapa AttributeValue crudo a un dict con tipos nativos
+    """
+    oferta = {}
+    for campo, av in item.items():
+        tipo = ESQUEMA_OFERTA.get(campo)
+        try:
+            if tipo is TEXTO:
+                oferta[campo] = av['S']
+            elif tipo is LISTA:
+                oferta[campo] = [v['S'] for v in av['L']]
+            elif tipo is ENTERO:
+                oferta[campo] = int(av['N'])
+            elif tipo is NUMERO:
+                oferta[campo] = float(av['N'])
+            else:
+                oferta[campo] = _decodificar_generico(av)
+        except (KeyError, ValueError):
+            # El ítem no sigue el esquema (datos antiguos o NULL)
+            oferta[campo] = _decodificar_generico(av)
+    return oferta
+
+
+def decodificar_columnas(items, columnas=None):
+    """
+    Decodifica una lista de ítems crudos directamente a formato columnar
+    (dict columna -> lista), listo para pd.DataFrame(...)
+    """
+    if columnas is None:
+        columnas = {}
+    total_previo = len(next(iter(columnas.values()))) if columnas else 0
+
+    for fila, item in enumerate(items, start=total_previo):
+        for campo, valor in decodificar_oferta(item).items():
+            columna = columnas.get(campo)
+            if columna is None:
+                # Columna nueva: rellenar las filas anteriores con None
+                columna = columnas[campo] = [None] * fila
+            columna.append(valor)
+        # Columnas ausentes en este ítem
+        for columna in columnas.values():
+            if len(columna) <= fila:
+                columna.append(None)
+    return columnas
+
+
+def escanear_items(cliente, nombre_tabla, **parametros):
+    """
+    Recorre la tabla completa con el cliente de bajo nivel, manejando
+    paginación, y devuelve los ítems crudos página por página
+    """
+    response = cliente.scan(TableName=nombre_tabla, **parametros)
+    yield response.get('Items', [])
+
+    while 'LastEvaluatedKey' in response:
+        response = cliente.scan(
+            TableName=nombre_tabla,
+            ExclusiveStartKey=response['LastEvaluatedKey'],
+            **parametros
+        )
+        yield response.get('Items', [])
+
+
+def escanear_columnas(cliente, nombre_tabla, **parametros):
+    """
+    Escanea la tabla y devuelve los datos en formato columnar
+    """
+    columnas = {}
+    for pagina in escanear_items(cliente, nombre_tabla, **parametros):
+        decodificar_columnas(pagina, columnas)
+    return columnas
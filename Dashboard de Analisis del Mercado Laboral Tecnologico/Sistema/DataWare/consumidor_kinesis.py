@@ -0,0 +1,383 @@
+import base64
+import importlib.util
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import boto3
+from botocore.exceptions import ClientError
+
+NOMBRE_STREAM = 'streamOfertas'
+ARCHIVO_CHECKPOINTS = 'checkpoints_kinesis.db'
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def cargar_lambda_handler():
+    """
+    Carga lambda_handler desde lambda.py ('lambda' es palabra reservada y
+    no se puede importar con import normal)
+    """
+    spec = importlib.util.spec_from_file_location('lambda_ofertas', os.path.join(DIRECTORIO, 'lambda.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.lambda_handler
+
+
+class AlmacenCheckpoints:
+    """
+    Último número de secuencia procesado por shard, en SQLite local
+    """
+    def __init__(self, ruta=ARCHIVO_CHECKPOINTS):
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conexion:
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " stream TEXT, shard_id TEXT, secuencia TEXT, cerrado INTEGER DEFAULT 0,"
+                " actualizado TEXT, PRIMARY KEY (stream, shard_id))"
+            )
+
+    def obtener(self, stream, shard_id):
+        with self.lock:
+            fila = self.conexion.execute(
+                "SELECT secuencia, cerrado FROM checkpoints WHERE stream = ? AND shard_id = ?",
+                (stream, shard_id)
+            ).fetchone()
+        return (fila[0], bool(fila[1])) if fila else (None, False)
+
+    def guardar(self, stream, shard_id, secuencia=None, cerrado=False):
+        with self.lock, self.conexion:
+            self.conexion.execute(
+                "INSERT INTO checkpoints (stream, shard_id, secuencia, cerrado, actualizado)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (stream, shard_id) DO UPDATE SET"
+                " secuencia = COALESCE(excluded.secuencia, secuencia),"
+                " cerrado = MAX(cerrado, excluded.cerrado), actualizado = excluded.actualizado",
+                (stream, shard_id, secuencia, int(cerrado), datetime.now().isoformat())
+            )
+
+
+class TrabajadorShard:
+    """
+    Lee un shard con un hilo de prefetch (get_records) y otro que procesa
+    los lotes en orden y guarda el checkpoint tras cada lote
+    """
+    def __init__(self, consumidor, shard_id, es_hijo=False):
+        self.consumidor = consumidor
+        self.shard_id = shard_id
+        # Shard creado por resharding: se lee completo para no perder registros
+        self.es_hijo = es_hijo
+        # Cada trabajador tiene su propio lambda_handler (como un contenedor
+        # Lambda, que atiende una invocación a la vez); los procesadores
+        # externos se comparten y se serializan en procesar_lote
+        self.procesador = cargar_lambda_handler() if consumidor.procesador is None else None
+        self.lotes = queue.Queue(maxsize=consumidor.prefetch)
+        self.detener = threading.Event()
+        self.terminado = threading.Event()
+        self.cerrado = False
+        # Terminó sin error (shard cerrado o fin de la ventana de replay)
+        self.completo = False
+        self.error = None
+        self.hilos = [
+            threading.Thread(target=self._leer, name=f'prefetch-{shard_id}', daemon=True),
+            threading.Thread(target=self._procesar, name=f'proceso-{shard_id}', daemon=True),
+        ]
+
+    def iniciar(self):
+        for hilo in self.hilos:
+            hilo.start()
+
+    def _iterador_inicial(self):
+        c = self.consumidor
+        secuencia, _ = c.checkpoints.obtener(c.stream, self.shard_id)
+        parametros = {'StreamName': c.stream, 'ShardId': self.shard_id}
+        if secuencia:
+            parametros.update(ShardIteratorType='AFTER_SEQUENCE_NUMBER', StartingSequenceNumber=secuencia)
+        elif c.desde is not None:
+            parametros.update(ShardIteratorType='AT_TIMESTAMP', Timestamp=c.desde)
+        elif self.es_hijo:
+            parametros['ShardIteratorType'] = 'TRIM_HORIZON'
+        else:
+            parametros['ShardIteratorType'] = c.posicion_inicial
+        return c.kinesis.get_shard_iterator(**parametros)['ShardIterator']
+
+    def _entregar(self, lote):
+        """
+        Encola un lote sin bloquearse para siempre si el proceso ya terminó
+        """
+        while not self.detener.is_set():
+            try:
+                self.lotes.put(lote, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _leer(self):
+        try:
+            self._leer_shard()
+        except Exception as e:
+            print(f"❌ Shard {self.shard_id}: {e}")
+            self.error = e
+            # Desbloquear el hilo de proceso; el shard se reintenta al redescubrir
+            self._entregar(([], False, True))
+
+    def _leer_shard(self):
+        c = self.consumidor
+        iterador = self._iterador_inicial()
+        espera = 0.2
+        while not self.detener.is_set():
+            try:
+                response = c.kinesis.get_records(ShardIterator=iterador, Limit=c.limite_lote)
+            except ClientError as e:
+                codigo = e.response['Error']['Code']
+                if codigo == 'ProvisionedThroughputExceededException':
+                    time.sleep(espera)
+                    espera = min(espera * 2, 5)
+                    continue
+                if codigo == 'ExpiredIteratorException':
+                    iterador = self._iterador_inicial()
+                    continue
+                raise
+            espera = 0.2
+
+            registros = response['Records']
+            if c.hasta is not None:
+                dentro = [r for r in registros if r['ApproximateArrivalTimestamp'] <= c.hasta]
+                if len(dentro) < len(registros):
+                    # Fin de la ventana de replay para este shard
+                    self._entregar((dentro, False, True))
+                    return
+                registros = dentro
+
+            iterador = response.get('NextShardIterator')
+            if not self._entregar((registros, iterador is None, False)) or iterador is None:
+                return
+            if not registros:
+                # Shard al día: en replay acotado también es el final
+                if c.hasta is not None and response.get('MillisBehindLatest', 0) == 0:
+                    self._entregar(([], False, True))
+                    return
+                time.sleep(c.pausa_vacio)
+
+    def _procesar(self):
+        c = self.consumidor
+        try:
+            while True:
+                registros, cerrado, fin_ventana = self.lotes.get()
+                if registros:
+                    c.procesar_lote(registros, self.procesador)
+                    c.checkpoints.guardar(c.stream, self.shard_id, registros[-1]['SequenceNumber'])
+                    c.contar(len(registros))
+                if cerrado:
+                    # Resharding: el shard se cerró y sus hijos pueden empezar
+                    self.cerrado = True
+                    c.checkpoints.guardar(c.stream, self.shard_id, cerrado=True)
+                if cerrado or fin_ventana:
+                    self.completo = self.error is None
+                    return
+        except Exception as e:
+            print(f"❌ Shard {self.shard_id}: {e}")
+            self.error = e
+        finally:
+            # Detener también el prefetch (si no, queda bloqueado en la cola)
+            self.detener.set()
+            self.terminado.set()
+            if not self.completo:
+                c.registrar_fallo(self)
+            c.cambios.set()
+
+
+class ConsumidorKinesis:
+    """
+    Consume todos los shards del stream en paralelo (un trabajador por
+    shard), respetando el orden padre → hijo al hacer resharding
+    """
+    def __init__(self, stream=NOMBRE_STREAM, procesador=None, checkpoints=None,
+                 endpoint_url=None, region='us-east-2', desde=None, hasta=None,
+                 posicion_inicial='TRIM_HORIZON', limite_lote=1000, prefetch=2,
+                 pausa_vacio=1.0, intervalo_descubrimiento=30, max_reintentos=3):
+        self.kinesis = boto3.client('kinesis', region_name=region, endpoint_url=endpoint_url)
+        self.stream = stream
+        self.procesador = procesador
+        self.lock_procesador = threading.Lock()
+        self.checkpoints = checkpoints or AlmacenCheckpoints()
+        self.desde = desde
+        self.hasta = hasta
+        self.posicion_inicial = posicion_inicial
+        self.limite_lote = limite_lote
+        self.prefetch = prefetch
+        self.pausa_vacio = pausa_vacio
+        self.intervalo_descubrimiento = intervalo_descubrimiento
+        self.max_reintentos = max_reintentos
+        self.trabajadores = {}
+        # Shards que fallaron: reintentos por shard, y en replay acotado los
+        # que agotaron los reintentos (el replay queda incompleto)
+        self.fallos = {}
+        self.shards_fallidos = set()
+        self.lock_fallos = threading.Lock()
+        self.cambios = threading.Event()
+        self.lock_contador = threading.Lock()
+        self.total_registros = 0
+
+    def procesar_lote(self, registros, procesador=None):
+        """
+        Arma un evento con el formato de Kinesis → Lambda y lo procesa
+        """
+        evento = {'Records': [
+            {
+                'eventSource': 'aws:kinesis',
+                'kinesis': {
+                    'data': base64.b64encode(r['Data']).decode('ascii'),
+                    'sequenceNumber': r['SequenceNumber'],
+                    'partitionKey': r['PartitionKey'],
+                },
+            }
+            for r in registros
+        ]}
+        if procesador is not None:
+            procesador(evento, None)
+            return
+        with self.lock_procesador:
+            self.procesador(evento, None)
+
+    def registrar_fallo(self, trabajador):
+        """
+        Libera el shard para reintentarlo en el próximo descubrimiento; en
+        replay acotado, tras max_reintentos se da por fallido
+        """
+        shard_id = trabajador.shard_id
+        with self.lock_fallos:
+            if self.trabajadores.get(shard_id) is trabajador:
+                del self.trabajadores[shard_id]
+            self.fallos[shard_id] = self.fallos.get(shard_id, 0) + 1
+            if self.hasta is not None and self.fallos[shard_id] > self.max_reintentos:
+                self.shards_fallidos.add(shard_id)
+
+    def pendientes_reintento(self):
+        with self.lock_fallos:
+            return [s for s in self.fallos if s not in self.trabajadores and s not in self.shards_fallidos]
+
+    def contar(self, cantidad):
+        with self.lock_contador:
+            self.total_registros += cantidad
+
+    def listar_shards(self):
+        shards = []
+        parametros = {'StreamName': self.stream}
+        while True:
+            response = self.kinesis.list_shards(**parametros)
+            shards.extend(response['Shards'])
+            if not response.get('NextToken'):
+                return shards
+            parametros = {'NextToken': response['NextToken']}
+
+    def _descubrir(self):
+        """
+        Inicia trabajadores para los shards listos: sin padres pendientes
+        """
+        shards = self.listar_shards()
+        conocidos = {s['ShardId'] for s in shards}
+
+        def terminado(shard_id):
+            if shard_id is None or shard_id not in conocidos:
+                return True  # Padre ya expirado del stream
+            trabajador = self.trabajadores.get(shard_id)
+            return (trabajador is not None and trabajador.cerrado) or self.checkpoints.obtener(self.stream, shard_id)[1]
+
+        for shard in shards:
+            shard_id = shard['ShardId']
+            if shard_id in self.trabajadores or shard_id in self.shards_fallidos:
+                continue
+            if self.checkpoints.obtener(self.stream, shard_id)[1]:
+                continue
+            padres = [shard.get('ParentShardId'), shard.get('AdjacentParentShardId')]
+            if all(terminado(padre) for padre in padres):
+                # Hijo de un padre que sigue en el stream (cerrado por resharding)
+                es_hijo = any(padre in conocidos for padre in padres if padre)
+                trabajador = TrabajadorShard(self, shard_id, es_hijo)
+                self.trabajadores[shard_id] = trabajador
+                trabajador.iniciar()
+                print(f"🧵 Shard {shard_id}: trabajador iniciado")
+
+    def ejecutar(self, intervalo_reporte=10):
+        print("🚀 INICIANDO CONSUMIDOR DE KINESIS")
+        print("=" * 50)
+        print(f"📡 Stream: {self.stream}")
+        if self.desde or self.hasta:
+            print(f"🗓️ Replay: {self.desde or 'inicio'} → {self.hasta or 'ahora'}")
+        print("📋 Presiona Ctrl+C para detener")
+        print("=" * 50)
+
+        inicio = time.monotonic()
+        ultimo_reporte = inicio
+        ultimo_descubrimiento = 0
+        try:
+            while True:
+                ahora = time.monotonic()
+                if ahora - ultimo_descubrimiento >= self.intervalo_descubrimiento or (
+                        self.cambios.is_set() and any(t.cerrado for t in list(self.trabajadores.values()))):
+                    self._descubrir()
+                    ultimo_descubrimiento = ahora
+                self.cambios.clear()
+
+                activos = [t for t in list(self.trabajadores.values()) if not t.terminado.is_set()]
+                if self.hasta is not None and not activos and not self.pendientes_reintento() and (
+                        self.trabajadores or self.shards_fallidos):
+                    break
+
+                if ahora - ultimo_reporte >= intervalo_reporte:
+                    print(f"📊 {self.total_registros} registros | {len(activos)} shards activos | "
+                          f"{self.total_registros / (ahora - inicio):.0f} reg/s")
+                    ultimo_reporte = ahora
+                self.cambios.wait(1)
+        except KeyboardInterrupt:
+            print("\n🛑 Consumidor detenido")
+            for trabajador in list(self.trabajadores.values()):
+                trabajador.detener.set()
+
+        segundos = time.monotonic() - inicio
+        if self.shards_fallidos:
+            print(f"\n❌ Replay incompleto: fallaron los shards {', '.join(sorted(self.shards_fallidos))}")
+        print(f"\n✅ Registros procesados: {self.total_registros}")
+        print(f"⏱️ Rendimiento: {self.total_registros / max(segundos, 1e-9):.0f} registros/s")
+        return self.total_registros
+
+
+def _fecha_utc(texto):
+    if texto is None:
+        return None
+    fecha = datetime.fromisoformat(texto)
+    return fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Consumidor paralelo del stream de ofertas')
+    parser.add_argument('--stream', default=NOMBRE_STREAM)
+    parser.add_argument('--endpoint-url', help='Kinesis local (kinesalite, localstack, moto server)')
+    parser.add_argument('--checkpoints', default=ARCHIVO_CHECKPOINTS,
+                        help='Archivo SQLite de checkpoints (usa uno nuevo para repetir un rango)')
+    parser.add_argument('--desde', help='Replay desde esta fecha ISO (UTC si no tiene zona)')
+    parser.add_argument('--hasta', help='Detenerse al llegar a esta fecha ISO')
+    parser.add_argument('--latest', action='store_true', help='Sin checkpoint, empezar por lo más nuevo')
+    parser.add_argument('--solo-medir', action='store_true',
+                        help='No invocar lambda_handler: solo medir el rendimiento de lectura')
+    args = parser.parse_args()
+
+    consumidor = ConsumidorKinesis(
+        stream=args.stream,
+        procesador=(lambda evento, contexto: None) if args.solo_medir else None,
+        checkpoints=AlmacenCheckpoints(args.checkpoints),
+        endpoint_url=args.endpoint_url,
+        desde=_fecha_utc(args.desde),
+        hasta=_fecha_utc(args.hasta),
+        posicion_inicial='LATEST' if args.latest else 'TRIM_HORIZON',
+    )
+    consumidor.ejecutar()
+    sys.exit(1 if consumidor.shards_fallidos else 0)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from derivadas_powerbi import ESPEC_DERIVADAS, explotar_lista
+
+# Desgloses por defecto: columna del DataFrame -> sufijo del archivo
+DESGLOSES = {
+    'Region_Departamento': 'region',
+    'Categoria_Puesto': 'categoria',
+}
+
+
+def matriz_incidencia(df, columnas=None, espec=ESPEC_DERIVADAS):
+    """
+    Matriz dispersa oferta × tecnología (CSR, 0/1) a partir de las columnas
+    *_Lista. Devuelve (matriz, nodos) donde nodos describe cada columna
+    """
+    columnas = columnas or espec['listas']
+    filas, tokens, origenes = [], [], []
+    for col in columnas:
+        if col not in df.columns:
+            continue
+        elementos = explotar_lista(df[col].to_numpy(), espec['separador'], espec['vacio'])
+        filas.append(elementos.index.to_numpy(dtype=np.int64))
+        tokens.append(elementos.to_numpy(dtype=object))
+        origenes.append(np.full(len(elementos), col, dtype=object))
+
+    if not filas:
+        return sparse.csr_matrix((len(df), 0), dtype=np.int32), pd.DataFrame(columns=['Tecnologia', 'Tipo'])
+
+    pares = pd.DataFrame({
+        'fila': np.concatenate(filas),
+        'token': np.concatenate(tokens),
+        'origen': np.concatenate(origenes),
+    })
+    # Misma tecnología con distinta capitalización = un solo nodo
+    pares['clave'] = pares['token'].str.casefold()
+    codigos, claves = pd.factorize(pares['clave'], sort=True)
+    pares['columna'] = codigos
+
+    # Nombre visible y lista de origen más frecuentes de cada tecnología
+    nodos = pd.DataFrame({
+        'Tecnologia': pares.groupby('columna')['token'].agg(lambda s: s.mode().iat[0]),
+        'Tipo': pares.groupby('columna')['origen'].agg(lambda s: s.mode().iat[0]),
+    }).reindex(range(len(claves)))
+
+    unicos = pares[['fila', 'columna']].drop_duplicates()
+    matriz = sparse.csr_matrix(
+        (np.ones(len(unicos), dtype=np.int32), (unicos['fila'].to_numpy(), unicos['columna'].to_numpy())),
+        shape=(len(df), len(claves))
+    )
+    return matriz, nodos
+
+
+def _pares(matriz, min_ofertas):
+    """
+    Conteos de co-ocurrencia (triángulo superior de X^T X) y soporte por nodo
+    """
+    total = matriz.shape[0]
+    soporte = np.asarray(matriz.sum(axis=0)).ravel()
+    conjunta = sparse.triu(matriz.T @ matriz, k=1).tocoo()
+    filtro = conjunta.data >= min_ofertas
+    a, b, juntas = conjunta.row[filtro], conjunta.col[filtro], conjunta.data[filtro].astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_ab = juntas / total
+        lift = juntas * total / (soporte[a].astype(np.float64) * soporte[b])
+        pmi = np.log2(lift)
+        npmi = np.where(p_ab < 1, pmi / -np.log2(p_ab), 1.0)
+    return total, soporte, a, b, juntas, lift, pmi, npmi
+
+
+def tabla_pares(matriz, nodos, min_ofertas=2):
+    """
+    Tabla de aristas: pares de tecnologías con conteo, soporte, lift y PMI
+    """
+    total, soporte, a, b, juntas, lift, pmi, npmi = _pares(matriz, min_ofertas)
+    nombres = nodos['Tecnologia'].to_numpy()
+    pares = pd.DataFrame({
+        'Tecnologia_A': nombres[a],
+        'Tecnologia_B': nombres[b],
+        'Ofertas_Juntas': juntas,
+        'Ofertas_A': soporte[a],
+        'Ofertas_B': soporte[b],
+        'Soporte': np.round(juntas / max(total, 1), 6),
+        'Confianza_A_B': np.round(juntas / soporte[a], 4),
+        'Confianza_B_A': np.round(juntas / soporte[b], 4),
+        'Lift': np.round(lift, 4),
+        'PMI': np.round(pmi, 4),
+        'NPMI': np.round(npmi, 4),
+    })
+    return pares.sort_values(['Ofertas_Juntas', 'Lift'], ascending=False).reset_index(drop=True)
+
+
+def tabla_nodos(matriz, nodos):
+    total = matriz.shape[0]
+    ofertas = np.asarray(matriz.sum(axis=0)).ravel()
+    tabla = nodos.assign(Ofertas=ofertas, Porcentaje=np.round(ofertas / max(total, 1) * 100, 2))
+    return tabla.sort_values('Ofertas', ascending=False).reset_index(drop=True)
+
+
+def tabla_pares_por_grupo(df, matriz, nodos, columna, min_ofertas=2):
+    """
+    Pares por grupo (región, categoría...): lift y PMI se calculan dentro
+    de cada grupo, operando sobre las filas de la matriz dispersa
+    """
+    grupos, etiquetas = pd.factorize(df[columna].fillna(ESPEC_DERIVADAS['vacio']).astype(str))
+    orden = np.argsort(grupos, kind='stable')
+    limites = np.searchsorted(grupos[orden], np.arange(len(etiquetas) + 1))
+
+    tablas = []
+    for g, etiqueta in enumerate(etiquetas):
+        filas = orden[limites[g]:limites[g + 1]]
+        tabla = tabla_pares(matriz[filas], nodos, min_ofertas)
+        if not tabla.empty:
+            tabla.insert(0, columna, etiqueta)
+            tablas.append(tabla)
+    if not tablas:
+        return pd.DataFrame(columns=[columna] + list(tabla_pares(matriz[:0], nodos).columns))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def exportar_coocurrencia(df, prefijo='powerbi_tecnologias', min_ofertas=2, desgloses=DESGLOSES):
+    """
+    Escribe las tablas de nodos y aristas para Power BI; devuelve los archivos
+    """
+    df = df.reset_index(drop=True)
+    matriz, nodos = matriz_incidencia(df)
+    archivos = {}
+
+    archivos['nodos'] = f'{prefijo}_nodos.csv'
+    tabla_nodos(matriz, nodos).to_csv(archivos['nodos'], index=False, encoding='utf-8-sig')
+
+    archivos['pares'] = f'{prefijo}_pares.csv'
+    tabla_pares(matriz, nodos, min_ofertas).to_csv(archivos['pares'], index=False, encoding='utf-8-sig')
+
+    for columna, sufijo in desgloses.items():
+        if columna in df.columns:
+            archivos[sufijo] = f'{prefijo}_pares_{sufijo}.csv'
+            tabla_pares_por_grupo(df, matriz, nodos, columna, min_ofertas).to_csv(
+                archivos[sufijo], index=False, encoding='utf-8-sig'
+            )
+    return archivos
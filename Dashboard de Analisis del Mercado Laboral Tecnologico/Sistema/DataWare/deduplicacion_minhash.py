@@ -0,0 +1,279 @@
+import pickle
+import re
+import zlib
+
+import numpy as np
+
+from archivos_atomicos import escribir_atomico
+
+# Parámetros MinHash/LSH: 64 permutaciones en 16 bandas de 4 filas.
+# Umbral aproximado de la curva S: (1/16) ** (1/4) = 0.5; una pareja con
+# Jaccard 0.7 se vuelve candidata con probabilidad ~0.99
+NUM_PERMUTACIONES = 64
+NUM_BANDAS = 16
+UMBRAL_SIMILITUD = 0.7
+
+# Índice persistente que comparten la carga a Kinesis y el script de revisión
+ARCHIVO_INDICE = 'indice_lsh_ofertas.pkl'
+
+_PRIMO = np.uint64((1 << 61) - 1)
+_MASCARA_32 = np.uint64((1 << 32) - 1)
+_PALABRAS = re.compile(r'\w+')
+
+CAMPOS_TEXTO = ['Titulo_Oferta', 'Nombre_Empresa', 'Contenido_Descripcion_Oferta']
+CAMPOS_LISTA = [
+    'Lenguajes_Lista', 'Frameworks_Lista', 'Bases_Datos_Lista',
+    'Herramientas_Lista', 'Conocimientos_Adicionales_Lista'
+]
+
+
+def tejas_oferta(oferta):
+    """
+    Conjunto de 'tejas' de la oferta: trigramas de palabras del título,
+    la empresa y la descripción, más un token por tecnología
+    """
+    tejas = set()
+    for campo in CAMPOS_TEXTO:
+        palabras = _PALABRAS.findall(str(oferta.get(campo) or '').lower())
+        if len(palabras) < 3:
+            tejas.update(f"{campo}:{p}" for p in palabras)
+        else:
+            tejas.update(' '.join(palabras[i:i + 3]) for i in range(len(palabras) - 2))
+    for campo in CAMPOS_LISTA:
+        valor = oferta.get(campo) or []
+        if isinstance(valor, str):
+            valor = re.split(r'[|,]', valor)
+        tejas.update(f"tec:{str(t).strip().lower()}" for t in valor if str(t).strip())
+    return tejas
+
+
+class IndiceLSH:
+    """
+    Índice LSH incremental sobre firmas MinHash. Cada banda guarda sus
+    claves en un arreglo ordenado (búsqueda binaria) más un diccionario de
+    altas recientes que se fusiona por lotes, así agregar y consultar
+    cuestan O(bandas · log n) y la memoria es ~12 bytes por banda y oferta
+    """
+    def __init__(self, num_permutaciones=NUM_PERMUTACIONES, num_bandas=NUM_BANDAS,
+                 umbral=UMBRAL_SIMILITUD, max_recientes=50000, semilla=1):
+        if num_permutaciones % num_bandas:
+            raise ValueError("num_permutaciones debe ser múltiplo de num_bandas")
+        self.num_permutaciones = num_permutaciones
+        self.num_bandas = num_bandas
+        self.filas_por_banda = num_permutaciones // num_bandas
+        self.umbral = umbral
+        self.max_recientes = max_recientes
+
+        rng = np.random.default_rng(semilla)
+        # Hash universal (a·x + b) mod p con a, b < 2^32 para no desbordar uint64
+        self._a = rng.integers(1, 1 << 32, size=num_permutaciones, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_permutaciones, dtype=np.uint64)
+        # Coeficientes impares para resumir cada banda en una clave de 64 bits
+        self._mezcla_banda = rng.integers(1, 1 << 63, size=self.filas_por_banda, dtype=np.uint64) | np.uint64(1)
+
+        self.ids = []
+        self.posiciones = {}
+        # id -> (id_original, similitud) de las ofertas marcadas como repost
+        self.duplicados = {}
+        self._firmas = np.empty((1024, num_permutaciones), dtype=np.uint32)
+        self._claves = [np.empty(0, dtype=np.uint64) for _ in range(num_bandas)]
+        self._filas = [np.empty(0, dtype=np.int64) for _ in range(num_bandas)]
+        self._recientes = [dict() for _ in range(num_bandas)]
+        self._total_recientes = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def firma(self, tejas):
+        """
+        Firma MinHash (uint32) de un conjunto de tejas, vectorizada con numpy
+        """
+        if not tejas:
+            return np.full(self.num_permutaciones, int(_MASCARA_32), dtype=np.uint32)
+        hashes = np.fromiter(
+            (zlib.crc32(t.encode('utf-8')) for t in tejas), dtype=np.uint64, count=len(tejas)
+        )
+        valores = (self._a * hashes[:, None]) % _PRIMO
+        valores = (valores + self._b) % _PRIMO
+        return (valores & _MASCARA_32).min(axis=0).astype(np.uint32)
+
+    def _claves_bandas(self, firma):
+        bandas = firma.astype(np.uint64).reshape(self.num_bandas, self.filas_por_banda)
+        with np.errstate(over='ignore'):
+            return (bandas * self._mezcla_banda).sum(axis=1, dtype=np.uint64)
+
+    def candidatos(self, firma):
+        """
+        Posiciones de las ofertas que comparten al menos una banda con la firma
+        """
+        encontrados = set()
+        for banda, clave in enumerate(self._claves_bandas(firma)):
+            claves = self._claves[banda]
+            inicio = np.searchsorted(claves, clave, side='left')
+            fin = np.searchsorted(claves, clave, side='right')
+            if fin > inicio:
+                encontrados.update(self._filas[banda][inicio:fin].tolist())
+            encontrados.update(self._recientes[banda].get(int(clave), ()))
+        return encontrados
+
+    def similitud(self, firma_a, firma_b):
+        """
+        Similitud de Jaccard estimada entre dos firmas
+        """
+        return float(np.count_nonzero(firma_a == firma_b)) / self.num_permutaciones
+
+    def buscar(self, firma):
+        """
+        Devuelve (id, similitud) del candidato más parecido sobre el umbral
+        """
+        filas = list(self.candidatos(firma))
+        if not filas:
+            return None
+        similitudes = np.count_nonzero(self._firmas[filas] == firma, axis=1) / self.num_permutaciones
+        mejor = int(np.argmax(similitudes))
+        if similitudes[mejor] < self.umbral:
+            return None
+        return self.ids[filas[mejor]], float(similitudes[mejor])
+
+    def agregar(self, id_oferta, firma):
+        fila = len(self.ids)
+        if fila == len(self._firmas):
+            self._firmas = np.concatenate([self._firmas, np.empty_like(self._firmas)])
+        self._firmas[fila] = firma
+        self.ids.append(id_oferta)
+        self.posiciones[id_oferta] = fila
+
+        for banda, clave in enumerate(self._claves_bandas(firma).tolist()):
+            self._recientes[banda].setdefault(clave, []).append(fila)
+        self._total_recientes += 1
+        if self._total_recientes >= self.max_recientes:
+            self._consolidar()
+
+    def _consolidar(self):
+        """
+        Fusiona las altas recientes en los arreglos ordenados (O(n) por banda)
+        """
+        for banda, recientes in enumerate(self._recientes):
+            if not recientes:
+                continue
+            claves = np.fromiter(
+                (clave for clave, filas in recientes.items() for _ in filas), dtype=np.uint64
+            )
+            filas = np.fromiter(
+                (fila for lista in recientes.values() for fila in lista), dtype=np.int64
+            )
+            orden = np.argsort(claves, kind='stable')
+            claves, filas = claves[orden], filas[orden]
+            destino = np.searchsorted(self._claves[banda], claves, side='right')
+            self._claves[banda] = np.insert(self._claves[banda], destino, claves)
+            self._filas[banda] = np.insert(self._filas[banda], destino, filas)
+            recientes.clear()
+        self._total_recientes = 0
+
+    def evaluar(self, id_oferta, oferta):
+        """
+        Busca un duplicado previo sin modificar el índice. Devuelve
+        (duplicado, firma); para un ID ya indexado devuelve la marca guardada
+        y firma None
+        """
+        if id_oferta in self.posiciones:
+            # Reenvío del mismo ID: conservar la marca de la primera vez
+            return self.duplicados.get(id_oferta), None
+        firma = self.firma(tejas_oferta(oferta))
+        return self.buscar(firma), firma
+
+    def confirmar(self, id_oferta, firma, duplicado=None):
+        """
+        Agrega al índice una oferta evaluada (tras enviarla con éxito)
+        """
+        if firma is None or id_oferta in self.posiciones:
+            return
+        self.agregar(id_oferta, firma)
+        if duplicado is not None:
+            self.duplicados[id_oferta] = duplicado
+
+    def registrar(self, id_oferta, oferta):
+        """
+        Paso de ingesta: calcula la firma, busca un duplicado previo y
+        agrega la oferta al índice. Devuelve (id_original, similitud) o None
+        """
+        duplicado, firma = self.evaluar(id_oferta, oferta)
+        self.confirmar(id_oferta, firma, duplicado)
+        return duplicado
+
+    def guardar(self, ruta):
+        self._consolidar()
+
+        # Reemplazo atómico: un corte a mitad de escritura no daña el índice
+        def escribir(temporal):
+            with open(temporal, 'wb') as f:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        escribir_atomico(ruta, escribir)
+
+    @staticmethod
+    def cargar(ruta):
+        with open(ruta, 'rb') as f:
+            indice = pickle.load(f)
+        # Índices guardados antes de conservar las marcas de duplicado
+        indice.__dict__.setdefault('duplicados', {})
+        return indice
+
+
+def marcar_duplicados(ofertas, indice=None):
+    """
+    Recorre las ofertas en orden y agrega 'Duplicado_De' y
+    'Similitud_Duplicado' a las que repiten una oferta anterior
+    """
+    indice = indice or IndiceLSH()
+    duplicados = 0
+    for oferta in ofertas:
+        resultado = indice.registrar(oferta['ID_Oferta'], oferta)
+        if resultado is not None:
+            oferta['Duplicado_De'], oferta['Similitud_Duplicado'] = resultado[0], round(resultado[1], 3)
+            duplicados += 1
+    return duplicados
+
+
+def descartar_duplicados(df):
+    """
+    Quita del DataFrame las ofertas marcadas como repost de otra
+    """
+    if 'Duplicado_De' not in df.columns:
+        return df, 0
+    es_duplicado = df['Duplicado_De'].notna() & (df['Duplicado_De'] != '')
+    df = df[~es_duplicado].drop(columns=['Duplicado_De', 'Similitud_Duplicado'], errors='ignore')
+    return df.reset_index(drop=True), int(es_duplicado.sum())
+
+
+if __name__ == "__main__":
+    import boto3
+    from codec_ofertas import codificar_oferta, decodificar_oferta, escanear_items
+
+    print("🔍 DETECTANDO OFERTAS DUPLICADAS (MinHash/LSH)")
+    print("=" * 50)
+
+    dynamodb = boto3.client('dynamodb', region_name='us-east-2')
+    ofertas = []
+    for pagina in escanear_items(dynamodb, 'ofertas_trabajo'):
+        ofertas.extend(decodificar_oferta(item) for item in pagina)
+
+    # Las más antiguas primero: la original es la que se conserva sin marca
+    ofertas.sort(key=lambda o: (o.get('fecha_procesamiento') or '', o['ID_Oferta']))
+    indice = IndiceLSH()
+    total = marcar_duplicados(ofertas, indice)
+
+    for oferta in ofertas:
+        if 'Duplicado_De' in oferta:
+            dynamodb.update_item(
+                TableName='ofertas_trabajo',
+                Key={'ID_Oferta': {'S': oferta['ID_Oferta']}},
+                UpdateExpression='SET Duplicado_De = :d, Similitud_Duplicado = :s',
+                ExpressionAttributeValues=codificar_oferta({
+                    ':d': oferta['Duplicado_De'], ':s': oferta['Similitud_Duplicado']
+                })
+            )
+
+    indice.guardar(ARCHIVO_INDICE)
+    print(f"📋 Ofertas revisadas: {len(ofertas)}")
+    print(f"🔁 Duplicados marcados: {total}")
+    print(f"💾 Índice guardado en {ARCHIVO_INDICE}")
@@ -0,0 +1,163 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# Especificación declarativa de las columnas derivadas para Power BI
+ESPEC_DERIVADAS = {
+    'separador': ' | ',
+    'vacio': 'No especificado',
+
+    # Columnas de listas tecnológicas (se unen con el separador)
+    'listas': [
+        'Lenguajes_Lista', 'Frameworks_Lista', 'Bases_Datos_Lista',
+        'Herramientas_Lista', 'Conocimientos_Adicionales_Lista'
+    ],
+
+    # Columna destino -> lista cuyos elementos se cuentan
+    'conteos': {
+        'Total_Lenguajes': 'Lenguajes_Lista',
+        'Total_Frameworks': 'Frameworks_Lista',
+        'Total_BD': 'Bases_Datos_Lista',
+    },
+
+    # Filtros Sí/No por tecnología (coincidencia exacta de elemento, sin
+    # distinguir mayúsculas: 'Java' no coincide con 'Javascript')
+    'banderas': [
+        {
+            'lista': 'Lenguajes_Lista',
+            'prefijo': 'Usa_',
+            'tecnologias': ['Python', 'JavaScript', 'Java', 'C#', 'React', 'Angular'],
+            'valores': ('Sí', 'No'),
+        },
+    ],
+
+    # Rangos de salario: límites superiores (exclusivos) y etiquetas
+    'rangos': {
+        'columna': 'Salario_Monto',
+        'destino': 'Rango_Salario',
+        'limites': [30000, 50000, 80000, 120000],
+        'etiquetas': ['Hasta $30K', '$30K - $50K', '$50K - $80K', '$80K - $120K', 'Más de $120K'],
+    },
+}
+
+
+def _como_lista(valor, corte, vacio):
+    if isinstance(valor, str):
+        # Datos leídos de un CSV previo: volver a separar los textos
+        return valor.split(corte) if valor != vacio else []
+    if isinstance(valor, (tuple, np.ndarray)):
+        return list(valor)
+    return []
+
+
+def _desplegar(valores, separador, vacio):
+    """
+    Despliega la columna una sola vez. Devuelve (elementos, listas,
+    limpias): la Serie de elementos no vacíos indexada por la posición de
+    la oferta, las listas originales por fila y una máscara de las filas
+    cuya lista ya estaba limpia (sin espacios sobrantes ni vacíos)
+    """
+    corte = separador.strip()
+    if set(map(type, valores)) <= {list}:
+        listas = list(valores)
+    else:
+        listas = [valor if isinstance(valor, list) else _como_lista(valor, corte, vacio) for valor in valores]
+    largos = np.fromiter(map(len, listas), dtype=np.int64, count=len(listas))
+    planos = list(chain.from_iterable(listas))
+    try:
+        recortados = list(map(str.strip, planos))
+        # strip solo cambia un texto si cambia su largo
+        alterados = np.fromiter(map(len, recortados), dtype=np.int64, count=len(planos)) \
+            != np.fromiter(map(len, planos), dtype=np.int64, count=len(planos))
+    except TypeError:
+        # Elementos que no son texto (números, nulos)
+        recortados = ['' if e is None or e != e else str(e).strip() for e in planos]
+        alterados = np.ones(len(planos), dtype=bool)
+
+    # object explícito: evita convertir a cadenas de Arrow en cada paso
+    elementos = np.empty(len(recortados), dtype=object)
+    elementos[:] = recortados
+    filas = np.repeat(np.arange(len(listas), dtype=np.int64), largos)
+
+    validos = elementos != ''
+    limpias = np.bincount(filas[alterados | ~validos], minlength=len(listas)) == 0
+    return pd.Series(elementos[validos], index=filas[validos], dtype=object), listas, limpias
+
+
+def explotar_lista(valores, separador, vacio):
+    """
+    Convierte una columna de listas (o de textos ya unidos) en una Serie
+    con un elemento por fila, indexada por la posición de la oferta
+    """
+    return _desplegar(valores, separador, vacio)[0]
+
+
+def aplicar_derivadas(df, espec=ESPEC_DERIVADAS):
+    """
+    Calcula todas las columnas derivadas de la especificación con
+    operaciones vectorizadas, explotando cada lista una sola vez
+    """
+    separador = espec['separador']
+    vacio = espec['vacio']
+    total = len(df)
+
+    banderas_por_lista = {}
+    for bandera in espec.get('banderas', []):
+        banderas_por_lista.setdefault(bandera['lista'], []).append(bandera)
+
+    for col in espec.get('listas', []):
+        if col not in df.columns:
+            continue
+
+        elementos, listas, limpias = _desplegar(df[col].to_numpy(), separador, vacio)
+        filas_elementos = elementos.index.to_numpy(dtype=np.int64)
+
+        # Conteos de elementos
+        conteo = np.bincount(filas_elementos, minlength=total)
+
+        # Texto unido para Power BI: join por fila sobre la lista original
+        # (un groupby().agg con join llamaría a Python por grupo). Solo las
+        # filas con elementos a recortar o vacíos se arman desde 'elementos'
+        texto = [
+            separador.join(lista) if limpia and lista else vacio
+            for lista, limpia in zip(listas, limpias.tolist())
+        ]
+        sucias = np.flatnonzero(~limpias)
+        if len(sucias):
+            valores = elementos.tolist()
+            fines = np.cumsum(conteo)
+            for fila in sucias.tolist():
+                inicio, fin = fines[fila] - conteo[fila], fines[fila]
+                texto[fila] = separador.join(valores[inicio:fin]) if fin > inicio else vacio
+        df[col] = texto
+        for destino, origen in espec.get('conteos', {}).items():
+            if origen == col:
+                df[destino] = conteo
+
+        # Banderas por tecnología: se comparan códigos enteros, no textos
+        if col in banderas_por_lista:
+            codigos, tokens = pd.factorize(np.array(list(map(str.casefold, elementos.tolist())), dtype=object))
+            posicion = {token: i for i, token in enumerate(tokens)}
+            for bandera in banderas_por_lista[col]:
+                si, no = bandera['valores']
+                for tecnologia in bandera['tecnologias']:
+                    marcas = np.zeros(total, dtype=bool)
+                    codigo = posicion.get(tecnologia.casefold())
+                    if codigo is not None:
+                        marcas[filas_elementos[codigos == codigo]] = True
+                    # Categórica Sí/No: sin materializar un texto por fila
+                    df[f"{bandera['prefijo']}{tecnologia}"] = pd.Categorical.from_codes(
+                        marcas.view(np.int8), categories=[no, si]
+                    )
+
+    rangos = espec.get('rangos')
+    if rangos and rangos['columna'] in df.columns:
+        valores = pd.to_numeric(df[rangos['columna']], errors='coerce').to_numpy(dtype=float)
+        indices = np.searchsorted(np.asarray(rangos['limites'], dtype=float), valores, side='right')
+        etiquetas = list(rangos['etiquetas'])
+        codigos = np.minimum(indices, len(etiquetas) - 1)
+        codigos[np.isnan(valores) | (valores == 0)] = len(etiquetas)
+        df[rangos['destino']] = pd.Categorical.from_codes(codigos, categories=etiquetas + [vacio])
+
+    return df
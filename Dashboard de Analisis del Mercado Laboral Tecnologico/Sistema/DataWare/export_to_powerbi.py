@@ -1,106 +1,68 @@
+import argparse
+import os
 import boto3
 import pandas as pd
-import json
-from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 
-def exportar_para_powerbi():
+from codec_ofertas import escanear_columnas
+from coocurrencia_tecnologias import exportar_coocurrencia
+from deduplicacion_minhash import descartar_duplicados
+from historial_snapshots import HistorialSnapshots
+from particiones_fecha import consultar_ventana, resolver_fecha
+from derivadas_powerbi import ESPEC_DERIVADAS, aplicar_derivadas
+
+def exportar_para_powerbi(desde=None, hasta=None):
     """
-    Exporta los datos del Data Warehouse para Power BI con listas normalizadas
+    Exporta los datos del Data Warehouse para Power BI con listas normalizadas.
+    Con 'desde'/'hasta' solo consulta las particiones de esa ventana de fechas
     """
     print("📊 EXPORTANDO DATA WAREHOUSE PARA POWER BI")
     print("=" * 50)
     
-    dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-    table = dynamodb.Table('ofertas_trabajo')
+    dynamodb = boto3.client('dynamodb', region_name='us-east-2')
     
     try:
-        # Obtener todos los datos
-        response = table.scan()
-        items = response['Items']
-        
-        # Manejar paginación si hay muchos registros
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
+        if desde is not None:
+            # Ventana de fechas: query paralela sobre el índice región/mes
+            hasta = hasta or date.today()
+            print(f"🗓️ Ventana: {desde.isoformat()} → {hasta.isoformat()}")
+            columnas = consultar_ventana(dynamodb, desde, hasta)
+        else:
+            # Obtener todos los datos (paginado, decodificado directo a columnas)
+            columnas = escanear_columnas(dynamodb, 'ofertas_trabajo')
+        total_items = len(columnas.get('ID_Oferta', []))
         
-        print(f"✅ {len(items)} registros obtenidos del Data Warehouse")
+        print(f"✅ {total_items} registros obtenidos del Data Warehouse")
         
-        if not items:
+        if not total_items:
             print("❌ No hay datos en la tabla")
             return False
         
-        # Convertir Decimals a float para Power BI
-        def decimal_default(obj):
-            if isinstance(obj, Decimal):
-                return float(obj)
-            raise TypeError
+        # Los números ya llegan como int/float, sin Decimal ni JSON intermedio
+        df = pd.DataFrame(columnas)
         
-        # Convertir a formato JSON y luego a DataFrame
-        items_json = json.loads(json.dumps(items, default=decimal_default))
-        df = pd.DataFrame(items_json)
+        # Excluir reposts para no inflar estadísticas de tecnologías y salarios
+        df, total_duplicados = descartar_duplicados(df)
+        if total_duplicados:
+            print(f"🔁 {total_duplicados} reposts excluidos del análisis")
         
         # ✅ MEJORADO: Preparar datos para Power BI con análisis avanzado
         if not df.empty:
             print("🔧 Procesando listas para análisis en Power BI...")
             
-            # Columnas de listas tecnológicas
-            list_columns = ['Lenguajes_Lista', 'Frameworks_Lista', 'Bases_Datos_Lista', 
-                           'Herramientas_Lista', 'Conocimientos_Adicionales_Lista']
-            
-            # Procesar cada columna de lista
-            for col in list_columns:
+            for col in ESPEC_DERIVADAS['listas']:
                 if col in df.columns:
                     print(f"   📋 Procesando: {col}")
-                    
-                    # Convertir listas a string separado por " | " (mejor para Power BI)
-                    df[col] = df[col].apply(lambda x: 
-                        ' | '.join(x) if isinstance(x, list) and x else 
-                        'No especificado'
-                    )
-                    
-                    # ✅ NUEVO: Crear columnas adicionales para análisis
-                    if col == 'Lenguajes_Lista':
-                        # Contar cantidad de lenguajes
-                        df['Total_Lenguajes'] = df[col].apply(
-                            lambda x: len(x.split(' | ')) if x != 'No especificado' else 0
-                        )
-                        
-                        # Crear columnas boolean para lenguajes populares
-                        lenguajes_populares = ['Python', 'JavaScript', 'Java', 'C#', 'React', 'Angular']
-                        for lenguaje in lenguajes_populares:
-                            df[f'Usa_{lenguaje}'] = df[col].apply(
-                                lambda x: 'Sí' if lenguaje in x else 'No'
-                            )
-                    
-                    elif col == 'Frameworks_Lista':
-                        df['Total_Frameworks'] = df[col].apply(
-                            lambda x: len(x.split(' | ')) if x != 'No especificado' else 0
-                        )
-                    
-                    elif col == 'Bases_Datos_Lista':
-                        df['Total_BD'] = df[col].apply(
-                            lambda x: len(x.split(' | ')) if x != 'No especificado' else 0
-                        )
-            
-            # ✅ NUEVO: Crear categorías de salario para análisis
-            if 'Salario_Monto' in df.columns:
-                print("   💰 Creando rangos de salario...")
-                def categorizar_salario(salario):
-                    if pd.isna(salario) or salario == 0:
-                        return 'No especificado'
-                    elif salario < 30000:
-                        return 'Hasta $30K'
-                    elif salario < 50000:
-                        return '$30K - $50K'
-                    elif salario < 80000:
-                        return '$50K - $80K'
-                    elif salario < 120000:
-                        return '$80K - $120K'
-                    else:
-                        return 'Más de $120K'
-                
-                df['Rango_Salario'] = df['Salario_Monto'].apply(categorizar_salario)
+            
+            # ✅ Tecnologías demandadas juntas: nodos y aristas (lift/PMI) a partir
+            # de la matriz dispersa oferta × tecnología
+            print("   🔗 Calculando co-ocurrencia de tecnologías...")
+            archivos_coocurrencia = exportar_coocurrencia(df)
+            
+            # ✅ Listas unidas con " | ", totales, filtros Usa_* y rangos de
+            # salario en una sola pasada vectorizada (ver derivadas_powerbi.py)
+            print("   ⚙️ Calculando columnas derivadas...")
+            df = aplicar_derivadas(df)
             
             # ✅ NUEVO: Normalizar modalidades de trabajo
             if 'Modalidad_Trabajo' in df.columns:
@@ -121,6 +83,14 @@ def exportar_para_powerbi():
             df.to_csv(archivo_powerbi, index=False, encoding='utf-8-sig')
             
             print(f"✅ Datos exportados a: {archivo_powerbi}")
+            
+            # ✅ Historial versionado: delta contra la última base en lugar de
+            # perder la versión anterior al sobrescribir el CSV (solo exports completos)
+            if desde is None:
+                historial = HistorialSnapshots(os.path.join('historial_powerbi', 'export'))
+                entrada = historial.registrar(df, df['Version_Dataset'].iat[0])
+                if entrada:
+                    print(f"🗂️ Versión {entrada['version']} guardada en el historial ({entrada['tipo']})")
             print(f"📈 {len(df)} registros listos para Power BI")
             print(f"📊 Columnas disponibles: {len(df.columns)}")
             
@@ -187,6 +157,10 @@ def exportar_para_powerbi():
                         porcentaje = (count / len(df)) * 100
                         print(f"   {i}. {tech}: {count} ofertas ({porcentaje:.1f}%)")
             
+            print(f"\n🔗 TABLAS DE CO-OCURRENCIA:")
+            for archivo in archivos_coocurrencia.values():
+                print(f"   • {archivo}")
+            
             return True
         else:
             print("❌ DataFrame vacío después de la conversión")
@@ -198,7 +172,19 @@ def exportar_para_powerbi():
         return False
 
 if __name__ == "__main__":
-    if exportar_para_powerbi():
+    parser = argparse.ArgumentParser(description='Exporta el Data Warehouse para Power BI')
+    parser.add_argument('--since', help="Fecha inicial de publicación (YYYY-MM-DD o relativa, ej. 30d)")
+    parser.add_argument('--until', help="Fecha final de publicación (YYYY-MM-DD, por defecto hoy)")
+    args = parser.parse_args()
+    if args.until and not args.since:
+        parser.error('--until requiere --since')
+    
+    try:
+        desde, hasta = resolver_fecha(args.since), resolver_fecha(args.until)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if exportar_para_powerbi(desde, hasta):
         print("\n🎉 ¡EXPORT COMPLETADO!")
         print("📄 Archivo generado: powerbi_ofertas_trabajo.csv")
         print("\n🔄 PRÓXIMOS PASOS EN POWER BI:")
@@ -0,0 +1,249 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from archivos_atomicos import escribir_atomico, escribir_json_atomico
+from derivadas_powerbi import ESPEC_DERIVADAS, explotar_lista
+
+CLAVE = 'ID_Oferta'
+COLUMNA_OPERACION = '_operacion'
+AGREGADO, CAMBIADO, ELIMINADO = 'A', 'C', 'E'
+
+# Columnas que cambian en cada exportación aunque los datos no cambien
+COLUMNAS_VOLATILES = ['ultima_actualizacion', 'version_datos', 'Fecha_Exportacion', 'Version_Dataset']
+
+
+class HistorialSnapshots:
+    """
+    Historial versionado del dataset de Power BI: cada sincronización se
+    guarda como delta (agregadas/cambiadas/eliminadas por ID_Oferta) contra
+    una base completa periódica, en Parquet
+    """
+    def __init__(self, directorio='historial_powerbi', cada_n_versiones=20, max_proporcion_delta=0.5):
+        self.directorio = directorio
+        self.cada_n_versiones = cada_n_versiones
+        self.max_proporcion_delta = max_proporcion_delta
+        self.ruta_manifiesto = os.path.join(directorio, 'manifiesto.json')
+        # Ruta de los hashes de historiales anteriores a hashes por versión
+        self.ruta_hashes_antigua = os.path.join(directorio, 'hashes_actuales.parquet')
+        os.makedirs(directorio, exist_ok=True)
+        self.manifiesto = self._leer_manifiesto()
+
+    def _leer_manifiesto(self):
+        if not os.path.exists(self.ruta_manifiesto):
+            return {'versiones': []}
+        with open(self.ruta_manifiesto, encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def versiones(self):
+        return [v['version'] for v in self.manifiesto['versiones']]
+
+    def _normalizar(self, df):
+        """
+        Quita columnas volátiles y guarda todo como texto (igual que el CSV)
+        """
+        df = df.drop(columns=[c for c in COLUMNAS_VOLATILES if c in df.columns])
+        df = df.astype(str).drop_duplicates(CLAVE, keep='last')
+        return df.sort_values(CLAVE).reset_index(drop=True)
+
+    def _ruta_hashes(self, entrada):
+        nombre = entrada.get('hashes')
+        if nombre is None:
+            return self.ruta_hashes_antigua
+        return os.path.join(self.directorio, nombre)
+
+    def _posicion(self, version, inicio):
+        """
+        Posición en el manifiesto de una versión o límite ('desde'/'hasta').
+        El orden es el del manifiesto: los sufijos por colisión ('_10' frente
+        a '_9') no ordenan bien como texto
+        """
+        versiones = self.versiones
+        if version in versiones:
+            return versiones.index(version)
+        if inicio:
+            return next((i for i, v in enumerate(versiones) if v >= version), len(versiones))
+        return max((i for i, v in enumerate(versiones) if v <= version), default=-1)
+
+    def _escribir_parquet(self, df, nombre):
+        ruta = os.path.join(self.directorio, nombre)
+        escribir_atomico(ruta, lambda temporal: df.to_parquet(temporal, index=False, compression='zstd'))
+        return nombre
+
+    def registrar(self, df, version=None):
+        """
+        Registra una nueva versión; devuelve la entrada del manifiesto o
+        None si los datos no cambiaron respecto a la versión anterior
+        """
+        version = version or datetime.now().strftime('%Y%m%d_%H%M%S')
+        if version in self.versiones:
+            version = f"{version}_{len(self.versiones)}"
+
+        actual = self._normalizar(df)
+        hashes = pd.DataFrame({
+            CLAVE: actual[CLAVE],
+            'hash': pd.util.hash_pandas_object(actual, index=False).to_numpy(),
+        })
+
+        entradas = self.manifiesto['versiones']
+        # Orden por posición en el manifiesto, no por nombre de versión
+        posicion_base = max((i for i, v in enumerate(entradas) if v['tipo'] == 'base'), default=None)
+        ultima_base = entradas[posicion_base] if posicion_base is not None else None
+        desde_base = len(entradas) - posicion_base - 1 if ultima_base else 0
+        ruta_hashes_anteriores = self._ruta_hashes(entradas[-1]) if entradas else None
+
+        entrada = {'version': version, 'fecha': datetime.now().isoformat(), 'registros': len(actual)}
+        necesita_base = (
+            ultima_base is None
+            or ultima_base['columnas'] != list(actual.columns)
+            or desde_base + 1 >= self.cada_n_versiones
+            or not os.path.exists(ruta_hashes_anteriores)
+        )
+
+        if not necesita_base:
+            anteriores = pd.read_parquet(ruta_hashes_anteriores)
+            comparados = anteriores.merge(hashes, on=CLAVE, how='outer', suffixes=('_ant', ''), indicator=True)
+            agregados = comparados.loc[comparados['_merge'] == 'right_only', CLAVE]
+            eliminados = comparados.loc[comparados['_merge'] == 'left_only', CLAVE]
+            cambiados = comparados.loc[
+                (comparados['_merge'] == 'both') & (comparados['hash_ant'] != comparados['hash']), CLAVE
+            ]
+            tocados = len(agregados) + len(eliminados) + len(cambiados)
+            if tocados == 0:
+                return None
+
+            if tocados <= self.max_proporcion_delta * max(len(actual), 1):
+                filas = actual[actual[CLAVE].isin(pd.concat([agregados, cambiados]))].copy()
+                filas[COLUMNA_OPERACION] = filas[CLAVE].isin(cambiados).map({True: CAMBIADO, False: AGREGADO})
+                bajas = pd.DataFrame({CLAVE: eliminados.to_numpy(), COLUMNA_OPERACION: ELIMINADO})
+                delta = pd.concat([filas, bajas], ignore_index=True)
+                entrada.update(
+                    tipo='delta', base=ultima_base['version'],
+                    archivo=self._escribir_parquet(delta, f'delta_{version}.parquet'),
+                    agregados=len(agregados), cambiados=len(cambiados), eliminados=len(eliminados),
+                )
+            else:
+                necesita_base = True
+
+        if necesita_base:
+            entrada.update(
+                tipo='base', base=version, columnas=list(actual.columns),
+                archivo=self._escribir_parquet(actual, f'base_{version}.parquet'),
+            )
+
+        # Hashes de esta versión antes que el manifiesto: el manifiesto es el
+        # punto de confirmación y siempre apunta a los hashes de su última versión
+        entrada['hashes'] = self._escribir_parquet(hashes, f'hashes_{version}.parquet')
+        entradas.append(entrada)
+        escribir_json_atomico(self.ruta_manifiesto, self.manifiesto)
+
+        # Los hashes anteriores ya no se usan
+        if ruta_hashes_anteriores and os.path.exists(ruta_hashes_anteriores):
+            os.remove(ruta_hashes_anteriores)
+        return entrada
+
+    def _leer(self, entrada):
+        return pd.read_parquet(os.path.join(self.directorio, entrada['archivo']))
+
+    @staticmethod
+    def _aplicar_delta(estado, delta):
+        tocados = delta[CLAVE]
+        nuevas = delta[delta[COLUMNA_OPERACION] != ELIMINADO].drop(columns=[COLUMNA_OPERACION])
+        return pd.concat([estado[~estado[CLAVE].isin(tocados)], nuevas], ignore_index=True)
+
+    def recorrer(self, desde=None, hasta=None):
+        """
+        Itera (entrada, estado) en orden aplicando cada delta una sola vez
+        sobre el estado anterior (reconstrucción incremental)
+        """
+        entradas = self.manifiesto['versiones']
+        if not entradas:
+            return
+        inicio_rango = self._posicion(desde, True) if desde else 0
+        fin_rango = self._posicion(hasta, False) if hasta else len(entradas) - 1
+
+        # Empezar en la última base anterior o igual a 'desde'
+        inicio = 0
+        for i, entrada in enumerate(entradas[:inicio_rango + 1]):
+            if entrada['tipo'] == 'base':
+                inicio = i
+
+        estado = None
+        for i in range(inicio, fin_rango + 1):
+            entrada = entradas[i]
+            if entrada['tipo'] == 'base':
+                estado = self._leer(entrada)
+            else:
+                estado = self._aplicar_delta(estado, self._leer(entrada))
+            if i >= inicio_rango:
+                yield entrada, estado
+
+    def reconstruir(self, version):
+        """
+        Estado completo del dataset en una versión pasada
+        """
+        if version not in self.versiones:
+            raise KeyError(f"Versión desconocida: {version}")
+        for entrada, estado in self.recorrer(desde=version, hasta=version):
+            return estado.sort_values(CLAVE).reset_index(drop=True)
+
+    def tendencia(self, metrica, desde=None, hasta=None):
+        """
+        Evalúa metrica(estado) -> escalar o Serie en cada versión y devuelve
+        un DataFrame indexado por versión
+        """
+        resultados = {}
+        for entrada, estado in self.recorrer(desde, hasta):
+            resultados[entrada['version']] = metrica(estado)
+        if resultados and all(isinstance(r, pd.Series) for r in resultados.values()):
+            return pd.DataFrame(resultados).T.fillna(0)
+        return pd.Series(resultados, name='valor').to_frame()
+
+
+def demanda_tecnologias(columna='Lenguajes_Lista', separador=ESPEC_DERIVADAS['separador'],
+                        vacio=ESPEC_DERIVADAS['vacio']):
+    """
+    Métrica para tendencia(): ofertas por tecnología en cada versión
+    """
+    def metrica(estado):
+        # Mismo desglose que los exportadores (separador literal, no regex)
+        return explotar_lista(estado[columna].to_numpy(), separador, vacio).value_counts()
+    return metrica
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Historial versionado del dataset de Power BI')
+    parser.add_argument('directorio', help='Directorio del historial (ej. historial_powerbi/live)')
+    sub = parser.add_subparsers(dest='accion', required=True)
+    sub.add_parser('listar')
+    reconstruir = sub.add_parser('reconstruir')
+    reconstruir.add_argument('version')
+    reconstruir.add_argument('salida')
+    tendencia = sub.add_parser('tendencia')
+    tendencia.add_argument('--columna', default='Lenguajes_Lista')
+    tendencia.add_argument('--desde')
+    tendencia.add_argument('--hasta')
+    tendencia.add_argument('salida')
+    args = parser.parse_args()
+
+    historial = HistorialSnapshots(args.directorio)
+    if args.accion == 'listar':
+        print("🗂️ VERSIONES DEL DATASET")
+        print("=" * 50)
+        for v in historial.manifiesto['versiones']:
+            detalle = (f"+{v['agregados']} ~{v['cambiados']} -{v['eliminados']}"
+                       if v['tipo'] == 'delta' else 'completa')
+            print(f"   {v['version']} [{v['tipo']}] {v['registros']} registros ({detalle})")
+    elif args.accion == 'reconstruir':
+        historial.reconstruir(args.version).to_csv(args.salida, index=False, encoding='utf-8-sig')
+        print(f"✅ Versión {args.version} reconstruida en {args.salida}")
+    else:
+        historial.tendencia(demanda_tecnologias(args.columna), args.desde, args.hasta).to_csv(
+            args.salida, index_label='version', encoding='utf-8-sig'
+        )
+        print(f"📈 Tendencia de {args.columna} guardada en {args.salida}")
@@ -1,20 +1,42 @@
 import base64
 import json
+import os
 import boto3
-import decimal
 from datetime import datetime
 
-dynamo = boto3.resource('dynamodb', region_name='us-east-2')
-tabla_ofertas = dynamo.Table('ofertas_trabajo')
+from codec_ofertas import codificar_oferta
+from particiones_fecha import campos_particion, registrar_particiones
+
+# Cliente de bajo nivel: evita cargar la capa resource en el arranque en frío
+dynamo = boto3.client('dynamodb', region_name='us-east-2')
+nombre_tabla = 'ofertas_trabajo'
+
+# Copia analítica opcional en Parquet (s3://bucket/ofertas_parquet)
+SINK_PARQUET_URI = os.environ.get('SINK_PARQUET_URI')
+sumidero = None
+
+def obtener_sumidero():
+    global sumidero
+    if sumidero is None and SINK_PARQUET_URI:
+        # Import diferido: pyarrow solo se carga si el sumidero está configurado
+        from sumidero_parquet import SumideroParquet
+        sumidero = SumideroParquet(SINK_PARQUET_URI)
+    return sumidero
 
 def lambda_handler(event, context):
+    particiones = set()
+    sink = obtener_sumidero()
     for record in event['Records']:
         try:
             # Decodificar y deserializar el registro de Kinesis
             payload = base64.b64decode(record['kinesis']['data'])
             item = json.loads(payload)
             
-            # Preparar el ítem para DynamoDB (convertir decimales si es necesario)
+            # Registro sintético de verificar_datawarehouse.py --sonda
+            if item.get('__sonda__'):
+                continue
+            
+            # Preparar el ítem para DynamoDB
             dynamo_item = {
                 'ID_Oferta': item.get('ID_Oferta', ''),
                 'Titulo_Oferta': item.get('Titulo_Oferta', ''),
@@ -24,7 +46,7 @@ def lambda_handler(event, context):
                 'Tipo_Contrato': item.get('Tipo_Contrato', ''),
                 'Tipo_Jornada': item.get('Tipo_Jornada', ''),
                 'Modalidad_Trabajo': item.get('Modalidad_Trabajo', ''),
-                'Salario_Monto': decimal.Decimal(str(item.get('Salario_Monto', 0))),
+                'Salario_Monto': float(item.get('Salario_Monto', 0)),
                 'Salario_Moneda': item.get('Salario_Moneda', ''),
                 'Salario_Tipo_Pago': item.get('Salario_Tipo_Pago', ''),
                 'Lenguajes_Lista': item.get('Lenguajes_Lista', []),
@@ -45,8 +67,36 @@ def lambda_handler(event, context):
                 'fecha_procesamiento': datetime.now().isoformat()
             }
             
-            tabla_ofertas.put_item(Item=dynamo_item)
+            # Marca de repost calculada en la carga (deduplicacion_minhash.py)
+            if item.get('Duplicado_De'):
+                dynamo_item['Duplicado_De'] = str(item['Duplicado_De'])
+                dynamo_item['Similitud_Duplicado'] = float(item.get('Similitud_Duplicado', 0))
+            
+            # Fecha ISO, mes y partición región/mes para el índice por fecha
+            dynamo_item.update(campos_particion(
+                dynamo_item['Region_Departamento'], dynamo_item['Fecha_Publicacion']
+            ))
+            
+            dynamo.put_item(TableName=nombre_tabla, Item=codificar_oferta(dynamo_item))
             print(f"✅ Oferta almacenada: {dynamo_item['ID_Oferta']}")
+            if 'Region_Mes' in dynamo_item:
+                particiones.add(dynamo_item['Region_Mes'])
+            if sink is not None:
+                sink.agregar(dynamo_item)
         except Exception as e:
             print(f"❌ Error procesando registro: {str(e)}")
+    
+    # Catálogo de particiones para las consultas por ventana de fechas
+    try:
+        registrar_particiones(dynamo, particiones)
+    except Exception as e:
+        print(f"❌ Error registrando particiones: {str(e)}")
+    
+    # Cada invocación escribe su micro-lote (el contenedor puede congelarse);
+    # los archivos pequeños se unen luego con 'sumidero_parquet.py compactar'
+    if sink is not None:
+        try:
+            sink.vaciar()
+        except Exception as e:
+            print(f"❌ Error escribiendo lote Parquet: {str(e)}")
     return {'statusCode': 200, 'body': 'Procesamiento completado'}
\ No newline at end of file
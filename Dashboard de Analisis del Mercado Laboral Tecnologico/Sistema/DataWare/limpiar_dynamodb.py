@@ -1,7 +1,28 @@
 import boto3
 import json
+import time
 from datetime import datetime
 
+from codec_ofertas import decodificar_oferta, escanear_items
+
+NOMBRE_TABLA = 'ofertas_trabajo'
+
+def _contar_registros(dynamodb):
+    """
+    Cuenta los registros de la tabla con paginación
+    """
+    scan = dynamodb.scan(TableName=NOMBRE_TABLA, Select='COUNT')
+    total_items = scan['Count']
+    
+    while 'LastEvaluatedKey' in scan:
+        scan = dynamodb.scan(
+            TableName=NOMBRE_TABLA,
+            Select='COUNT',
+            ExclusiveStartKey=scan['LastEvaluatedKey']
+        )
+        total_items += scan['Count']
+    return total_items
+
 def limpiar_tabla_dynamodb():
     """
     Limpia completamente la tabla DynamoDB
@@ -9,26 +30,16 @@ def limpiar_tabla_dynamodb():
     print("🗑️ LIMPIANDO TABLA DYNAMODB")
     print("=" * 50)
     
-    dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-    table = dynamodb.Table('ofertas_trabajo')
+    dynamodb = boto3.client('dynamodb', region_name='us-east-2')
     
     try:
         # 1. Verificar tabla existe
-        response = table.table_status
-        print(f"✅ Tabla encontrada: {table.name}")
+        response = dynamodb.describe_table(TableName=NOMBRE_TABLA)['Table']['TableStatus']
+        print(f"✅ Tabla encontrada: {NOMBRE_TABLA}")
         print(f"📊 Estado: {response}")
         
-        # 2. Contar registros actuales
-        scan = table.scan(Select='COUNT')
-        total_items = scan['Count']
-        
-        # Manejar paginación para conteo exacto
-        while 'LastEvaluatedKey' in scan:
-            scan = table.scan(
-                Select='COUNT',
-                ExclusiveStartKey=scan['LastEvaluatedKey']
-            )
-            total_items += scan['Count']
+        # 2. Contar registros actuales (con paginación para conteo exacto)
+        total_items = _contar_registros(dynamodb)
         
         print(f"📋 Registros actuales: {total_items}")
         
@@ -47,17 +58,10 @@ def limpiar_tabla_dynamodb():
         # 4. Obtener y eliminar todos los items
         print("🔄 Eliminando registros...")
         
-        # Scan para obtener claves primarias
-        scan = table.scan(ProjectionExpression='ID_Oferta')
-        items_to_delete = scan['Items']
-        
-        # Manejar paginación
-        while 'LastEvaluatedKey' in scan:
-            scan = table.scan(
-                ProjectionExpression='ID_Oferta',
-                ExclusiveStartKey=scan['LastEvaluatedKey']
-            )
-            items_to_delete.extend(scan['Items'])
+        # Scan para obtener claves primarias (ya en formato AttributeValue)
+        items_to_delete = []
+        for pagina in escanear_items(dynamodb, NOMBRE_TABLA, ProjectionExpression='ID_Oferta'):
+            items_to_delete.extend(pagina)
         
         print(f"📋 Items a eliminar: {len(items_to_delete)}")
         
@@ -70,10 +74,21 @@ def limpiar_tabla_dynamodb():
             lote = items_to_delete[i:i+25]
             
             try:
-                with table.batch_writer() as batch:
-                    for item in lote:
-                        batch.delete_item(Key={'ID_Oferta': item['ID_Oferta']})
-                        eliminados += 1
+                peticiones = {NOMBRE_TABLA: [
+                    {'DeleteRequest': {'Key': {'ID_Oferta': item['ID_Oferta']}}}
+                    for item in lote
+                ]}
+                
+                # Reintentar los elementos no procesados (throttling)
+                intento = 0
+                while peticiones:
+                    response = dynamodb.batch_write_item(RequestItems=peticiones)
+                    peticiones = response.get('UnprocessedItems', {})
+                    if peticiones:
+                        intento += 1
+                        time.sleep(min(0.05 * 2 ** intento, 2))
+                
+                eliminados += len(lote)
                 
                 # Mostrar progreso
                 if eliminados % 100 == 0:
@@ -89,8 +104,7 @@ def limpiar_tabla_dynamodb():
         print(f"   📊 Tasa de éxito: {(eliminados/len(items_to_delete)*100):.1f}%")
         
         # 5. Verificar tabla vacía
-        scan_final = table.scan(Select='COUNT')
-        print(f"   📋 Registros restantes: {scan_final['Count']}")
+        print(f"   📋 Registros restantes: {_contar_registros(dynamodb)}")
         
         return True
         
@@ -106,28 +120,17 @@ def respaldar_antes_limpiar():
     print("=" * 50)
     
     try:
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-        table = dynamodb.Table('ofertas_trabajo')
-        
-        # Scan todos los datos
-        response = table.scan()
-        items = response['Items']
+        dynamodb = boto3.client('dynamodb', region_name='us-east-2')
         
-        # Manejar paginación
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
+        # Scan todos los datos (decodificados directo a tipos nativos)
+        items = []
+        for pagina in escanear_items(dynamodb, NOMBRE_TABLA):
+            items.extend(decodificar_oferta(item) for item in pagina)
         
         if not items:
             print("ℹ️ No hay datos para respaldar")
             return True
         
-        # Convertir Decimal a float para JSON
-        def decimal_default(obj):
-            if isinstance(obj, boto3.dynamodb.types.TypeDeserializer().deserialize.__self__.__class__):
-                return float(obj)
-            raise TypeError
-        
         # Guardar respaldo
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         archivo_respaldo = f'respaldo_ofertas_{timestamp}.json'
@@ -189,19 +192,18 @@ def mostrar_estadisticas_tabla():
     print("=" * 50)
     
     try:
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-2')
-        table = dynamodb.Table('ofertas_trabajo')
+        dynamodb = boto3.client('dynamodb', region_name='us-east-2')
         
         # Información general
-        response = table.scan(Select='COUNT')
-        total_items = response['Count']
+        total_items = _contar_registros(dynamodb)
         
         # Obtener muestra de datos
-        sample_scan = table.scan(Limit=5)
-        sample_items = sample_scan['Items']
+        sample_scan = dynamodb.scan(TableName=NOMBRE_TABLA, Limit=5)
+        sample_items = [decodificar_oferta(item) for item in sample_scan['Items']]
         
+        estado = dynamodb.describe_table(TableName=NOMBRE_TABLA)['Table']['TableStatus']
         print(f"📋 Total registros: {total_items}")
-        print(f"📊 Estado tabla: {table.table_status}")
+        print(f"📊 Estado tabla: {estado}")
         
         if sample_items:
             print(f"\n📄 Muestra de registros:")
@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from codec_ofertas import decodificar_columnas, escanear_items
+
+NOMBRE_TABLA = 'ofertas_trabajo'
+TABLA_METRICAS = 'metricas_ofertas'
+INDICE_FECHA = 'region_mes-fecha-index'
+
+# Ítem de metricas_ofertas con el conjunto de particiones Region_Mes existentes
+METRICA_PARTICIONES = 'particiones_region_mes'
+
+FORMATOS_FECHA = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+SIN_REGION = 'No especificado'
+
+
+def normalizar_fecha(texto):
+    """
+    Convierte 'dd/mm/yyyy' (o ISO) a date; None si no se puede interpretar
+    """
+    texto = str(texto or '').strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def clave_particion(region, mes):
+    return f"{region or SIN_REGION}#{mes}"
+
+
+def campos_particion(region, fecha_publicacion):
+    """
+    Campos derivados para el índice por fecha: fecha ISO, mes y partición
+    región/mes. Si la fecha no es válida no se agregan (el ítem queda
+    fuera del índice, que es disperso)
+    """
+    fecha = normalizar_fecha(fecha_publicacion)
+    if fecha is None:
+        return {}
+    mes = fecha.strftime('%Y-%m')
+    return {
+        'Fecha_ISO': fecha.isoformat(),
+        'Mes_Publicacion': mes,
+        'Region_Mes': clave_particion(region, mes),
+    }
+
+
+def resolver_fecha(texto, hoy=None):
+    """
+    Interpreta 'YYYY-MM-DD' o un desplazamiento relativo como '30d'
+    """
+    if texto is None:
+        return None
+    hoy = hoy or date.today()
+    texto = texto.strip().lower()
+    if texto.endswith('d') and texto[:-1].isdigit():
+        return hoy - timedelta(days=int(texto[:-1]))
+    fecha = normalizar_fecha(texto)
+    if fecha is None:
+        raise ValueError(f"Fecha no válida: {texto} (usa YYYY-MM-DD o Nd)")
+    return fecha
+
+
+def meses_en_rango(desde, hasta):
+    """
+    Lista de buckets 'YYYY-MM' que cubren el intervalo [desde, hasta]
+    """
+    meses = []
+    anio, mes = desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        meses.append(f"{anio:04d}-{mes:02d}")
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return meses
+
+
+def registrar_particiones(cliente, particiones):
+    """
+    Agrega particiones Region_Mes al catálogo en metricas_ofertas
+    (una sola escritura por lote)
+    """
+    particiones = sorted(set(particiones))
+    if not particiones:
+        return
+    cliente.update_item(
+        TableName=TABLA_METRICAS,
+        Key={'metrica_id': {'S': METRICA_PARTICIONES}},
+        UpdateExpression='ADD particiones :p',
+        ExpressionAttributeValues={':p': {'SS': particiones}}
+    )
+
+
+def listar_particiones(cliente, desde, hasta):
+    """
+    Particiones Region_Mes registradas cuyos meses caen en la ventana
+    """
+    response = cliente.get_item(
+        TableName=TABLA_METRICAS,
+        Key={'metrica_id': {'S': METRICA_PARTICIONES}},
+        ConsistentRead=True
+    )
+    registradas = response.get('Item', {}).get('particiones', {}).get('SS', [])
+    meses = set(meses_en_rango(desde, hasta))
+    return sorted(p for p in registradas if p.rsplit('#', 1)[-1] in meses)
+
+
+def _consultar_particion(cliente, particion, desde, hasta):
+    """
+    Query paginada de una partición Region_Mes acotada por fecha
+    """
+    parametros = {
+        'TableName': NOMBRE_TABLA,
+        'IndexName': INDICE_FECHA,
+        'KeyConditionExpression': 'Region_Mes = :p AND Fecha_ISO BETWEEN :desde AND :hasta',
+        'ExpressionAttributeValues': {
+            ':p': {'S': particion},
+            ':desde': {'S': desde.isoformat()},
+            ':hasta': {'S': hasta.isoformat()},
+        },
+    }
+    items = []
+    while True:
+        response = cliente.query(**parametros)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        parametros['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def consultar_ventana(cliente, desde, hasta, max_hilos=8):
+    """
+    Obtiene en formato columnar las ofertas publicadas entre 'desde' y
+    'hasta', consultando en paralelo solo las particiones de la ventana
+    """
+    particiones = listar_particiones(cliente, desde, hasta)
+    columnas = {}
+    if not particiones:
+        return columnas
+
+    with ThreadPoolExecutor(max_workers=min(max_hilos, len(particiones))) as ejecutor:
+        resultados = ejecutor.map(
+            lambda particion: _consultar_particion(cliente, particion, desde, hasta),
+            particiones
+        )
+        for items in resultados:
+            decodificar_columnas(items, columnas)
+    return columnas
+
+
+def rellenar_particiones(cliente):
+    """
+    Agrega Fecha_ISO/Mes_Publicacion/Region_Mes a los ítems cargados antes
+    de existir el índice y registra sus particiones
+    """
+    actualizados = 0
+    particiones = set()
+    proyeccion = {
+        'ProjectionExpression': 'ID_Oferta, Region_Departamento, Fecha_Publicacion, Region_Mes',
+    }
+    for pagina in escanear_items(cliente, NOMBRE_TABLA, **proyeccion):
+        for item in pagina:
+            region = item.get('Region_Departamento', {}).get('S', '')
+            campos = campos_particion(region, item.get('Fecha_Publicacion', {}).get('S', ''))
+            if not campos:
+                continue
+            particiones.add(campos['Region_Mes'])
+            if item.get('Region_Mes', {}).get('S') == campos['Region_Mes']:
+                continue
+            cliente.update_item(
+                TableName=NOMBRE_TABLA,
+                Key={'ID_Oferta': item['ID_Oferta']},
+                UpdateExpression='SET Fecha_ISO = :f, Mes_Publicacion = :m, Region_Mes = :p',
+                ExpressionAttributeValues={
+                    ':f': {'S': campos['Fecha_ISO']},
+                    ':m': {'S': campos['Mes_Publicacion']},
+                    ':p': {'S': campos['Region_Mes']},
+                }
+            )
+            actualizados += 1
+    registrar_particiones(cliente, particiones)
+    return actualizados, len(particiones)
+
+
+if __name__ == "__main__":
+    import boto3
+
+    print("🗓️ RELLENANDO PARTICIONES POR FECHA DE PUBLICACIÓN")
+    print("=" * 50)
+    dynamodb = boto3.client('dynamodb', region_name='us-east-2')
+    actualizados, total_particiones = rellenar_particiones(dynamodb)
+    print(f"✅ Ítems actualizados: {actualizados}")
+    print(f"📦 Particiones región/mes registradas: {total_particiones}")
@@ -0,0 +1,269 @@
+import json
+import time
+import uuid
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from codec_ofertas import ENTERO, ESQUEMA_OFERTA, LISTA, NUMERO
+
+# Esquema Parquet derivado del esquema fijo de la tabla
+_TIPOS_ARROW = {ENTERO: pa.int64(), NUMERO: pa.float64(), LISTA: pa.list_(pa.string())}
+ESQUEMA_PARQUET = pa.schema([
+    (campo, _TIPOS_ARROW.get(tipo, pa.string())) for campo, tipo in ESQUEMA_OFERTA.items()
+])
+
+# Columna de partición estilo Hive (fecha=YYYY-MM-DD), ver infra/main.tf
+COLUMNA_PARTICION = 'fecha'
+
+
+def abrir_destino(destino):
+    """
+    Devuelve (sistema_de_archivos, ruta_base) para una ruta local o un URI
+    s3://bucket/prefijo (admite ?endpoint_override=... para moto/minio)
+    """
+    if '://' not in destino:
+        return pafs.LocalFileSystem(), destino.rstrip('/')
+    sistema, ruta = pafs.FileSystem.from_uri(destino)
+    return sistema, ruta.rstrip('/')
+
+
+def fecha_particion(oferta):
+    """
+    Fecha de publicación ISO; si no es válida, la fecha de procesamiento
+    """
+    fecha = oferta.get('Fecha_ISO') or str(oferta.get('fecha_procesamiento') or '')[:10]
+    return fecha or datetime.now().strftime('%Y-%m-%d')
+
+
+def _tamano_aproximado(oferta):
+    """
+    Estimación barata del tamaño de la oferta en bytes
+    """
+    total = 0
+    for valor in oferta.values():
+        if isinstance(valor, str):
+            total += len(valor)
+        elif isinstance(valor, list):
+            total += sum(len(str(v)) for v in valor) + 4
+        else:
+            total += 8
+    return total
+
+
+class SumideroParquet:
+    """
+    Acumula ofertas y escribe micro-lotes Parquet particionados por fecha
+    cuando se supera el máximo de registros, de bytes o de antigüedad
+    """
+    def __init__(self, destino, max_registros=5000, max_bytes=16 * 1024 * 1024,
+                 max_segundos=60, sistema_archivos=None):
+        if sistema_archivos is None:
+            self.fs, self.ruta_base = abrir_destino(destino)
+        else:
+            self.fs, self.ruta_base = sistema_archivos, destino.rstrip('/')
+        self.max_registros = max_registros
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.buffer = {}
+        self.registros = 0
+        self.bytes = 0
+        self.inicio_lote = None
+        self.archivos_escritos = 0
+
+    def agregar(self, oferta):
+        if self.inicio_lote is None:
+            self.inicio_lote = time.monotonic()
+        self.buffer.setdefault(fecha_particion(oferta), []).append(oferta)
+        self.registros += 1
+        self.bytes += _tamano_aproximado(oferta)
+
+        if self.registros >= self.max_registros or self.bytes >= self.max_bytes:
+            self.vaciar()
+        else:
+            self.vaciar_si_vencido()
+
+    def vaciar_si_vencido(self):
+        """
+        Escribe el lote si supera la antigüedad máxima (llamar periódicamente)
+        """
+        if self.inicio_lote is not None and time.monotonic() - self.inicio_lote >= self.max_segundos:
+            self.vaciar()
+
+    def vaciar(self):
+        """
+        Escribe un archivo Parquet por partición con las ofertas acumuladas.
+        Cada partición sale del buffer en cuanto su archivo queda escrito, así
+        un fallo a mitad de camino no vuelve a escribir las ya guardadas
+        """
+        escritos = []
+        marca = datetime.now().strftime('%Y%m%d%H%M%S')
+        for fecha in list(self.buffer):
+            ofertas = self.buffer[fecha]
+            directorio = f"{self.ruta_base}/{COLUMNA_PARTICION}={fecha}"
+            self.fs.create_dir(directorio, recursive=True)
+            ruta = f"{directorio}/lote-{marca}-{uuid.uuid4().hex[:8]}.parquet"
+            tabla = pa.Table.from_pylist(
+                [{campo: oferta.get(campo) for campo in ESQUEMA_PARQUET.names} for oferta in ofertas],
+                schema=ESQUEMA_PARQUET
+            )
+            pq.write_table(tabla, ruta, filesystem=self.fs, compression='snappy')
+            escritos.append(ruta)
+            self.archivos_escritos += 1
+
+            del self.buffer[fecha]
+            self.registros -= len(ofertas)
+            self.bytes -= sum(_tamano_aproximado(oferta) for oferta in ofertas)
+
+        self.inicio_lote = None
+        return escritos
+
+    def cerrar(self):
+        return self.vaciar()
+
+
+def _oculto(ruta):
+    """
+    Athena (y Hive) ignoran los archivos que empiezan con '_' o '.'
+    """
+    return ruta.rsplit('/', 1)[-1].startswith(('_', '.'))
+
+
+def _terminar_compactacion(fs, ruta_manifiesto):
+    """
+    Completa (de forma idempotente) una compactación registrada: borra los
+    originales, publica el archivo unido y elimina el manifiesto
+    """
+    with fs.open_input_stream(ruta_manifiesto) as f:
+        manifiesto = json.loads(f.read().decode('utf-8'))
+    for ruta in manifiesto['origenes']:
+        if fs.get_file_info(ruta).type == pafs.FileType.File:
+            fs.delete_file(ruta)
+    if fs.get_file_info(manifiesto['temporal']).type == pafs.FileType.File:
+        fs.move(manifiesto['temporal'], manifiesto['final'])
+    fs.delete_file(ruta_manifiesto)
+
+
+def compactar(destino, tamano_objetivo=128 * 1024 * 1024, filas_por_grupo=128 * 1024,
+              min_archivos=2, sistema_archivos=None):
+    """
+    Une los archivos pequeños de cada partición en archivos de
+    ~tamano_objetivo con row groups grandes; devuelve (leídos, escritos).
+
+    El archivo unido se escribe oculto ('_compactado-*') y un manifiesto
+    oculto registra los originales antes de borrarlos; al final se publica
+    con su nombre definitivo. Si el proceso se corta, la siguiente
+    ejecución termina las compactaciones pendientes, así nunca quedan filas
+    duplicadas. Mientras se compacta un grupo, una consulta concurrente
+    puede no ver sus filas durante un instante (entre el borrado de los
+    originales y la publicación), pero nunca las ve dos veces
+    """
+    if sistema_archivos is None:
+        fs, ruta_base = abrir_destino(destino)
+    else:
+        fs, ruta_base = sistema_archivos, destino.rstrip('/')
+
+    archivos_base = [
+        info for info in fs.get_file_info(pafs.FileSelector(ruta_base, recursive=True, allow_not_found=True))
+        if info.type == pafs.FileType.File
+    ]
+
+    # Terminar compactaciones interrumpidas; los archivos unidos sin
+    # manifiesto son de una ejecución cortada antes de registrarla
+    manifiestos = [i.path for i in archivos_base if i.base_name.startswith('_compactacion-')]
+    for ruta_manifiesto in manifiestos:
+        _terminar_compactacion(fs, ruta_manifiesto)
+    pendientes = {ruta.replace('_compactacion-', '_compactado-').replace('.json', '.parquet') for ruta in manifiestos}
+    for info in archivos_base:
+        if info.base_name.startswith('_compactado-') and info.path not in pendientes:
+            fs.delete_file(info.path)
+
+    # Archivos pequeños agrupados por directorio de partición
+    particiones = {}
+    for info in fs.get_file_info(pafs.FileSelector(ruta_base, recursive=True, allow_not_found=True)):
+        if info.type != pafs.FileType.File or not info.path.endswith('.parquet') or _oculto(info.path):
+            continue
+        if info.size >= tamano_objetivo // 2:
+            continue
+        particiones.setdefault(info.path.rsplit('/', 1)[0], []).append(info)
+
+    leidos = escritos = 0
+    for directorio, archivos in sorted(particiones.items()):
+        if len(archivos) < min_archivos:
+            continue
+
+        # Grupos de archivos que suman ~tamano_objetivo
+        grupos, grupo, acumulado = [], [], 0
+        for info in sorted(archivos, key=lambda i: i.path):
+            if grupo and acumulado + info.size > tamano_objetivo:
+                grupos.append(grupo)
+                grupo, acumulado = [], 0
+            grupo.append(info)
+            acumulado += info.size
+        grupos.append(grupo)
+
+        for grupo in grupos:
+            if len(grupo) < min_archivos:
+                continue
+            tabla = pa.concat_tables([
+                pq.read_table(info.path, filesystem=fs, schema=ESQUEMA_PARQUET) for info in grupo
+            ])
+            sufijo = uuid.uuid4().hex[:12]
+            temporal = f"{directorio}/_compactado-{sufijo}.parquet"
+            pq.write_table(tabla, temporal, filesystem=fs, compression='snappy', row_group_size=filas_por_grupo)
+
+            # El manifiesto es el punto de confirmación de la compactación
+            ruta_manifiesto = f"{directorio}/_compactacion-{sufijo}.json"
+            manifiesto = {
+                'origenes': [info.path for info in grupo],
+                'temporal': temporal,
+                'final': f"{directorio}/compactado-{sufijo}.parquet",
+            }
+            with fs.open_output_stream(ruta_manifiesto) as f:
+                f.write(json.dumps(manifiesto).encode('utf-8'))
+            _terminar_compactacion(fs, ruta_manifiesto)
+            leidos += len(grupo)
+            escritos += 1
+
+    return leidos, escritos
+
+
+def exportar_tabla(destino, region='us-east-2'):
+    """
+    Carga inicial: vuelca la tabla DynamoDB completa al sumidero
+    """
+    import boto3
+    from codec_ofertas import decodificar_oferta, escanear_items
+
+    dynamodb = boto3.client('dynamodb', region_name=region)
+    sumidero = SumideroParquet(destino, max_segundos=float('inf'))
+    total = 0
+    for pagina in escanear_items(dynamodb, 'ofertas_trabajo'):
+        for item in pagina:
+            sumidero.agregar(decodificar_oferta(item))
+            total += 1
+    sumidero.cerrar()
+    return total, sumidero.archivos_escritos
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sumidero Parquet del data lake de ofertas')
+    parser.add_argument('accion', choices=['exportar', 'compactar'])
+    parser.add_argument('destino', help='Ruta local o s3://bucket/ofertas_parquet')
+    parser.add_argument('--tamano-objetivo-mb', type=int, default=128)
+    args = parser.parse_args()
+
+    if args.accion == 'exportar':
+        print("🪣 EXPORTANDO DYNAMODB AL DATA LAKE PARQUET")
+        print("=" * 50)
+        total, archivos = exportar_tabla(args.destino)
+        print(f"✅ {total} ofertas escritas en {archivos} archivos")
+    else:
+        print("🗜️ COMPACTANDO ARCHIVOS PEQUEÑOS")
+        print("=" * 50)
+        leidos, escritos = compactar(args.destino, tamano_objetivo=args.tamano_objetivo_mb * 1024 * 1024)
+        print(f"✅ {leidos} archivos unidos en {escritos} archivos compactados")
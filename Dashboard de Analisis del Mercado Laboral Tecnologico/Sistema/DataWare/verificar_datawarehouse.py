@@ -1,81 +1,290 @@
-import boto3
-import pandas as pd
+import json
+import math
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def verificar_estado_datawarehouse():
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+REGION = 'us-east-2'
+NOMBRE_STREAM = 'streamOfertas'
+TABLAS_CANDIDATAS = ['ofertas_trabajo', 'OfertasTrabajo']
+NOMBRE_LAMBDA = 'ofertas-processor'
+
+# Prefijo de los ítems sintéticos de la sonda (lambda.py ignora estos registros)
+PREFIJO_SONDA = '__sonda__'
+CODIGOS_THROTTLING = {
+    'ProvisionedThroughputExceededException', 'ThrottlingException',
+    'RequestLimitExceeded', 'LimitExceededException',
+}
+
+
+def percentil(valores, p):
+    """
+    Percentil por rango más cercano (valores ya en ms)
+    """
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def _cronometrar(funcion, **parametros):
+    inicio = time.perf_counter()
+    response = funcion(**parametros)
+    return response, (time.perf_counter() - inicio) * 1000
+
+
+def sondear_kinesis(kinesis):
     """
-    Verifica el estado actual de tu Data Warehouse
+    Estado y capacidad del stream a partir de sus metadatos
     """
-    print("🏗️ VERIFICANDO ESTADO DEL DATA WAREHOUSE")
-    print("=" * 50)
-    
-    status = {"kinesis": False, "dynamodb": False, "lambda": False}
-    
-    # 1. Verificar Kinesis Stream
-    kinesis = boto3.client('kinesis', region_name='us-east-2')
     try:
-        response = kinesis.describe_stream(StreamName='streamOfertas')
-        print(f"✅ Kinesis Stream: {response['StreamDescription']['StreamStatus']}")
-        print(f"   📊 Shards: {len(response['StreamDescription']['Shards'])}")
-        status["kinesis"] = True
+        response, ms = _cronometrar(kinesis.describe_stream_summary, StreamName=NOMBRE_STREAM)
+        resumen = response['StreamDescriptionSummary']
+        return {
+            'ok': resumen['StreamStatus'] == 'ACTIVE',
+            'estado': resumen['StreamStatus'],
+            'shards_abiertos': resumen['OpenShardCount'],
+            'retencion_horas': resumen['RetentionPeriodHours'],
+            'consumidores': resumen.get('ConsumerCount', 0),
+            'latencia_control_ms': round(ms, 1),
+        }
     except Exception as e:
-        print(f"❌ Kinesis Stream: {e}")
-    
-    # 2. Verificar DynamoDB (con nombre correcto)
-    dynamodb_client = boto3.client('dynamodb', region_name='us-east-2')
-    dynamodb_resource = boto3.resource('dynamodb', region_name='us-east-2')
-    
-    # Intentar ambos nombres de tabla
-    table_names = ['ofertas_trabajo', 'OfertasTrabajo']
-    
-    for table_name in table_names:
+        return {'ok': False, 'error': str(e)}
+
+
+def sondear_dynamodb(dynamodb):
+    """
+    Estado, conteo y tamaño de la tabla desde describe_table (sin scan;
+    DynamoDB actualiza ItemCount/TableSizeBytes cada ~6 horas)
+    """
+    errores = {}
+    for nombre_tabla in TABLAS_CANDIDATAS:
         try:
-            response = dynamodb_client.describe_table(TableName=table_name)
-            print(f"✅ DynamoDB Table '{table_name}': {response['Table']['TableStatus']}")
-            
-            # Contar registros
-            table = dynamodb_resource.Table(table_name)
-            scan_response = table.scan(Select='COUNT')
-            print(f"   📊 Total registros: {scan_response['Count']}")
-            status["dynamodb"] = True
-            break
-            
+            response, ms = _cronometrar(dynamodb.describe_table, TableName=nombre_tabla)
         except Exception as e:
-            print(f"❌ DynamoDB Table '{table_name}': {e}")
-    
-    # 3. Verificar Lambda
-    lambda_client = boto3.client('lambda', region_name='us-east-2')
+            errores[nombre_tabla] = str(e)
+            continue
+        tabla = response['Table']
+        return {
+            'ok': tabla['TableStatus'] == 'ACTIVE',
+            'tabla': nombre_tabla,
+            'estado': tabla['TableStatus'],
+            'registros_aprox': tabla.get('ItemCount', 0),
+            'tamano_bytes_aprox': tabla.get('TableSizeBytes', 0),
+            'indices': [
+                {'nombre': indice['IndexName'], 'estado': indice.get('IndexStatus')}
+                for indice in tabla.get('GlobalSecondaryIndexes', [])
+            ],
+            'stream_habilitado': bool(tabla.get('StreamSpecification', {}).get('StreamEnabled')),
+            'latencia_control_ms': round(ms, 1),
+        }
+    return {'ok': False, 'error': errores}
+
+
+def sondear_lambda(lambda_client):
     try:
-        response = lambda_client.get_function(FunctionName='ofertas-processor')
-        print(f"✅ Lambda Function: {response['Configuration']['State']}")
-        print(f"   ⚡ Runtime: {response['Configuration']['Runtime']}")
-        status["lambda"] = True
+        response, ms = _cronometrar(lambda_client.get_function, FunctionName=NOMBRE_LAMBDA)
+        configuracion = response['Configuration']
+        return {
+            'ok': configuracion.get('State') == 'Active',
+            'estado': configuracion.get('State'),
+            'runtime': configuracion.get('Runtime'),
+            'memoria_mb': configuracion.get('MemorySize'),
+            'latencia_control_ms': round(ms, 1),
+        }
     except Exception as e:
-        print(f"❌ Lambda Function: {e}")
-    
-    # 4. Resumen final
+        return {'ok': False, 'error': str(e)}
+
+
+def _llamada_medida(funcion, metricas, clave, **parametros):
+    """
+    Ejecuta una llamada de datos registrando latencia, reintentos y throttling
+    """
+    try:
+        response, ms = _cronometrar(funcion, **parametros)
+    except ClientError as e:
+        if e.response['Error']['Code'] in CODIGOS_THROTTLING:
+            metricas['throttling'] += 1
+        else:
+            metricas['errores'] += 1
+        return None
+    except BotoCoreError:
+        # Sin conexión, timeout de lectura...: cuenta como error, no aborta la puerta
+        metricas['errores'] += 1
+        return None
+    metricas[clave].append(ms)
+    metricas['reintentos'] += response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+    return response
+
+
+def sonda_latencia(dynamodb, kinesis, nombre_tabla, repeticiones=20):
+    """
+    Ida y vuelta sintética: put/get en DynamoDB y put en Kinesis; los
+    ítems de la sonda se eliminan al terminar
+    """
+    metricas = {
+        'put_ms': [], 'get_ms': [], 'kinesis_put_ms': [],
+        'throttling': 0, 'reintentos': 0, 'errores': 0,
+    }
+    prefijo = f"{PREFIJO_SONDA}-{uuid.uuid4().hex[:8]}"
+    claves = []
+    try:
+        for i in range(repeticiones):
+            clave = {'ID_Oferta': {'S': f"{prefijo}-{i}"}}
+            item = dict(clave, Titulo_Oferta={'S': 'sonda de latencia'},
+                        fecha_procesamiento={'S': datetime.now().isoformat()})
+            # Se registra antes del put: si falla por timeout el ítem pudo quedar escrito
+            claves.append(clave)
+            if _llamada_medida(dynamodb.put_item, metricas, 'put_ms', TableName=nombre_tabla, Item=item):
+                _llamada_medida(dynamodb.get_item, metricas, 'get_ms',
+                                TableName=nombre_tabla, Key=clave, ConsistentRead=True)
+
+        # Un solo registro a Kinesis: lambda.py lo reconoce y no lo almacena
+        _llamada_medida(
+            kinesis.put_record, metricas, 'kinesis_put_ms',
+            StreamName=NOMBRE_STREAM,
+            Data=json.dumps({PREFIJO_SONDA: True, 'ID_Oferta': prefijo}),
+            PartitionKey=prefijo
+        )
+    finally:
+        # Nunca dejar ítems de la sonda en la tabla (los exportadores los publicarían)
+        for clave in claves:
+            try:
+                dynamodb.delete_item(TableName=nombre_tabla, Key=clave)
+            except Exception:
+                metricas['errores'] += 1
+
+    resultado = {
+        'repeticiones': repeticiones,
+        'throttling': metricas['throttling'],
+        'reintentos': metricas['reintentos'],
+        'errores': metricas['errores'],
+    }
+    for operacion in ('put_ms', 'get_ms', 'kinesis_put_ms'):
+        valores = metricas[operacion]
+        resultado[operacion] = {
+            'p50': percentil(valores, 50), 'p95': percentil(valores, 95), 'p99': percentil(valores, 99),
+            'muestras': len(valores),
+        }
+    return resultado
+
+
+def verificar_estado_datawarehouse(repeticiones_sonda=0, max_p99_ms=None, mostrar=True):
+    """
+    Verifica el estado actual de tu Data Warehouse (sondas en paralelo)
+    """
+    kinesis = boto3.client('kinesis', region_name=REGION)
+    dynamodb_client = boto3.client('dynamodb', region_name=REGION)
+    lambda_client = boto3.client('lambda', region_name=REGION)
+
+    if mostrar:
+        print("🏗️ VERIFICANDO ESTADO DEL DATA WAREHOUSE")
+        print("=" * 50)
+
+    with ThreadPoolExecutor(max_workers=3) as ejecutor:
+        futuros = {
+            'kinesis': ejecutor.submit(sondear_kinesis, kinesis),
+            'dynamodb': ejecutor.submit(sondear_dynamodb, dynamodb_client),
+            'lambda': ejecutor.submit(sondear_lambda, lambda_client),
+        }
+        resultado = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    if repeticiones_sonda and resultado['dynamodb']['ok'] and resultado['kinesis']['ok']:
+        resultado['latencia'] = sonda_latencia(
+            dynamodb_client, kinesis, resultado['dynamodb']['tabla'], repeticiones_sonda
+        )
+
+    # Puerta previa a una carga: ingesta y almacenamiento operativos, sin
+    # throttling y con p99 dentro del límite
+    listo = resultado['kinesis']['ok'] and resultado['dynamodb']['ok']
+    latencia = resultado.get('latencia')
+    if latencia:
+        listo = listo and latencia['throttling'] == 0 and latencia['errores'] == 0
+        if max_p99_ms is not None:
+            for operacion in ('put_ms', 'get_ms', 'kinesis_put_ms'):
+                p99 = latencia[operacion]['p99']
+                listo = listo and p99 is not None and p99 <= max_p99_ms
+    resultado['listo_para_carga'] = listo
+    resultado['fecha'] = datetime.now().isoformat()
+
+    if mostrar:
+        _mostrar_resultado(resultado)
+    return resultado
+
+
+def _mostrar_resultado(resultado):
+    kinesis = resultado['kinesis']
+    if kinesis['ok']:
+        print(f"✅ Kinesis Stream: {kinesis['estado']}")
+        print(f"   📊 Shards: {kinesis['shards_abiertos']}")
+    else:
+        print(f"❌ Kinesis Stream: {kinesis.get('error', kinesis.get('estado'))}")
+
+    dynamodb = resultado['dynamodb']
+    if dynamodb['ok']:
+        print(f"✅ DynamoDB Table '{dynamodb['tabla']}': {dynamodb['estado']}")
+        print(f"   📊 Total registros (aprox.): {dynamodb['registros_aprox']}")
+        print(f"   💾 Tamaño (aprox.): {dynamodb['tamano_bytes_aprox'] / 1024 / 1024:.1f} MB")
+    else:
+        print(f"❌ DynamoDB: {dynamodb.get('error', dynamodb.get('estado'))}")
+
+    funcion = resultado['lambda']
+    if funcion['ok']:
+        print(f"✅ Lambda Function: {funcion['estado']}")
+        print(f"   ⚡ Runtime: {funcion['runtime']}")
+    else:
+        print(f"❌ Lambda Function: {funcion.get('error', funcion.get('estado'))}")
+
+    latencia = resultado.get('latencia')
+    if latencia:
+        print("\n⏱️ SONDA DE LATENCIA:")
+        for operacion, etiqueta in (('put_ms', 'DynamoDB put'), ('get_ms', 'DynamoDB get'),
+                                    ('kinesis_put_ms', 'Kinesis put')):
+            datos = latencia[operacion]
+            if datos['muestras']:
+                print(f"   {etiqueta}: p50 {datos['p50']:.1f} ms | p95 {datos['p95']:.1f} ms | p99 {datos['p99']:.1f} ms")
+        print(f"   🚦 Throttling: {latencia['throttling']} | Reintentos: {latencia['reintentos']} | Errores: {latencia['errores']}")
+
     print("\n🎯 ESTADO GENERAL:")
-    if status["kinesis"]:
+    if kinesis['ok']:
         print("✅ Ingesta de datos: Funcional")
     else:
         print("❌ Ingesta de datos: Falta Kinesis Stream")
-        
-    if status["dynamodb"]:
-        print("✅ Almacenamiento: Funcional") 
+
+    if dynamodb['ok']:
+        print("✅ Almacenamiento: Funcional")
     else:
         print("❌ Almacenamiento: Falta tabla DynamoDB")
-        
-    if status["lambda"]:
+
+    if funcion['ok']:
         print("✅ Procesamiento: Funcional")
     else:
         print("⚠️ Procesamiento: Lambda opcional para export")
-    
-    if status["kinesis"] and status["dynamodb"]:
+
+    if resultado['listo_para_carga']:
         print("\n🏆 ¡Tu Data Warehouse está OPERATIVO!")
         print("🔄 Puedes ejecutar:")
         print("   python export_to_powerbi.py")
     else:
         print("\n⚠️ Tu Data Warehouse necesita configuración")
 
+
 if __name__ == "__main__":
-    verificar_estado_datawarehouse()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Verifica el estado del Data Warehouse')
+    parser.add_argument('--sonda', type=int, default=0, metavar='N',
+                        help='Ejecutar N ida y vuelta sintéticas put/get y medir p50/p95/p99')
+    parser.add_argument('--max-p99-ms', type=float, help='Fallar si algún p99 supera este valor')
+    parser.add_argument('--json', action='store_true', help='Salida JSON para usar como puerta de carga')
+    args = parser.parse_args()
+
+    resultado = verificar_estado_datawarehouse(args.sonda, args.max_p99_ms, mostrar=not args.json)
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False, default=str))
+    sys.exit(0 if resultado['listo_para_carga'] else 1)
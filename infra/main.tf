@@ -123,6 +123,170 @@ resource "aws_glue_catalog_table" "tabla_ofertas_2" {
 }
 
 
+# 🪵 Glue Table Parquet (micro-lotes de sumidero_parquet.py, particionados por fecha)
+resource "aws_glue_catalog_table" "tabla_ofertas_parquet" {
+  name          = "ofertas_parquet"
+  database_name = aws_glue_catalog_database.base_datos_glue_2.name
+  table_type    = "EXTERNAL_TABLE"
+
+  partition_keys {
+    name = "fecha"
+    type = "string"
+  }
+
+  storage_descriptor {
+    location      = "s3://${aws_s3_bucket.datos_bucket.bucket}/ofertas_parquet/"
+    input_format  = "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat"
+    output_format = "org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat"
+
+    ser_de_info {
+      name                  = "SerDeParquet"
+      serialization_library = "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+    }
+
+    columns {
+      name = "id_oferta"
+      type = "string"
+    }
+    columns {
+      name = "titulo_oferta"
+      type = "string"
+    }
+    columns {
+      name = "ciudad"
+      type = "string"
+    }
+    columns {
+      name = "region_departamento"
+      type = "string"
+    }
+    columns {
+      name = "fecha_publicacion"
+      type = "string"
+    }
+    columns {
+      name = "tipo_contrato"
+      type = "string"
+    }
+    columns {
+      name = "tipo_jornada"
+      type = "string"
+    }
+    columns {
+      name = "modalidad_trabajo"
+      type = "string"
+    }
+    columns {
+      name = "salario_monto"
+      type = "double"
+    }
+    columns {
+      name = "salario_moneda"
+      type = "string"
+    }
+    columns {
+      name = "salario_tipo_pago"
+      type = "string"
+    }
+    columns {
+      name = "lenguajes_lista"
+      type = "array<string>"
+    }
+    columns {
+      name = "frameworks_lista"
+      type = "array<string>"
+    }
+    columns {
+      name = "bases_datos_lista"
+      type = "array<string>"
+    }
+    columns {
+      name = "herramientas_lista"
+      type = "array<string>"
+    }
+    columns {
+      name = "nivel_ingles"
+      type = "string"
+    }
+    columns {
+      name = "nivel_educacion"
+      type = "string"
+    }
+    columns {
+      name = "anos_experiencia"
+      type = "bigint"
+    }
+    columns {
+      name = "conocimientos_adicionales_lista"
+      type = "array<string>"
+    }
+    columns {
+      name = "edad_minima"
+      type = "bigint"
+    }
+    columns {
+      name = "edad_maxima"
+      type = "bigint"
+    }
+    columns {
+      name = "categoria_puesto"
+      type = "string"
+    }
+    columns {
+      name = "nombre_empresa"
+      type = "string"
+    }
+    columns {
+      name = "contenido_descripcion_empresa"
+      type = "string"
+    }
+    columns {
+      name = "enlace_oferta"
+      type = "string"
+    }
+    columns {
+      name = "contenido_descripcion_oferta"
+      type = "string"
+    }
+    columns {
+      name = "fecha_procesamiento"
+      type = "string"
+    }
+    columns {
+      name = "fecha_iso"
+      type = "string"
+    }
+    columns {
+      name = "mes_publicacion"
+      type = "string"
+    }
+    columns {
+      name = "region_mes"
+      type = "string"
+    }
+    columns {
+      name = "duplicado_de"
+      type = "string"
+    }
+    columns {
+      name = "similitud_duplicado"
+      type = "double"
+    }
+  }
+
+  # Proyección de particiones: Athena no necesita MSCK REPAIR al llegar lotes nuevos
+  parameters = {
+    "classification"                 = "parquet"
+    "projection.enabled"             = "true"
+    "projection.fecha.type"          = "date"
+    "projection.fecha.format"        = "yyyy-MM-dd"
+    "projection.fecha.range"         = "2020-01-01,NOW"
+    "projection.fecha.interval"      = "1"
+    "projection.fecha.interval.unit" = "DAYS"
+    "storage.location.template"      = "s3://${aws_s3_bucket.datos_bucket.bucket}/ofertas_parquet/fecha=$${fecha}/"
+  }
+}
+
 
 # 🔍 Athena Workgroup duplicado (opcional, solo si quieres separarlo)
 resource "aws_athena_workgroup" "default_2" {